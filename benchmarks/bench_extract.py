@@ -0,0 +1,98 @@
+"""Compare HTML text extraction backends on a corpus of saved pages.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_extract [PAGES_DIR] [--repeat N] [--json FILE]
+
+PAGES_DIR is searched recursively for *.html / *.htm files. Without it a
+deterministic synthetic corpus is generated instead.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from blocker.extract import BACKENDS, extract_text
+
+
+def load_corpus(directory):
+    """Read every saved page under a directory"""
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith((".html", ".htm")):
+                with open(os.path.join(root, name), "rb") as f:
+                    pages.append(f.read().decode("utf-8", "replace"))
+    return pages
+
+
+def synthetic_corpus(count=20, seed=0):
+    """Generate pages with scripts, styles and nested markup"""
+    rng = random.Random(seed)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "elit"]
+    pages = []
+    for _ in range(count):
+        parts = ["<html><head><title>Page</title>"]
+        parts.append("<style>" + "body{margin:0}" * rng.randint(10, 200) + "</style>")
+        parts.append("</head><body>")
+        for _ in range(rng.randint(200, 3000)):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 30)))
+            tag = rng.choice(["p", "div", "li", "span", "td"])
+            parts.append(f"<{tag} class='c'>{text} &amp; <b>{text}</b></{tag}>")
+            if rng.random() < 0.05:
+                parts.append("<script>var x = '" + text + "';</script>")
+        parts.append("</body></html>")
+        pages.append("".join(parts))
+    return pages
+
+
+def run(pages, repeat=3):
+    """Time every backend over the corpus, best of ``repeat`` runs"""
+    total_bytes = sum(len(page) for page in pages)
+    results = []
+    for backend in BACKENDS:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for page in pages:
+                extract_text(page, backend)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.append(
+            {
+                "backend": backend,
+                "pages": len(pages),
+                "bytes": total_bytes,
+                "seconds": best,
+                "mb_per_second": total_bytes / best / 1e6 if best else 0.0,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="?", help="directory of saved pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.pages) if args.pages else synthetic_corpus()
+    results = run(pages, args.repeat)
+
+    baseline = next(r["seconds"] for r in results if r["backend"] == "bs4")
+    for result in results:
+        print(
+            f"{result['backend']:<12} {result['seconds']:8.3f}s "
+            f"{result['mb_per_second']:8.2f} MB/s "
+            f"{baseline / result['seconds']:6.1f}x vs bs4"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Benchmark the content filter's hot paths.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_filter [--only GROUP ...] [--sizes N ...]
+        [--repeat N] [--json FILE]
+
+Groups:
+
+    content    check_content across keyword counts and text sizes
+    batch      check_content one by one against check_contents over a
+               batch of 256 documents
+    webpage    check_webpage against a local HTTP server
+    blocklist  block_url / unblock_url / get_blocked_urls / is_blocked on a
+               temporary hosts file with --sizes entries (default 10k, 100k;
+               add 1000000 for the large case)
+    keywords   adding keywords one by one and in bulk, and saving them
+
+All data comes from benchmarks.corpus, so runs are reproducible. Each
+timing is the best of --repeat runs, in seconds per call.
+"""
+import argparse
+import http.server
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from blocker.cache import ScoreCache
+from blocker.dns import BackgroundFlusher, NullFlusher
+from blocker.filter import ContentFilter
+from blocker.matcher import KeywordMatcher
+
+from . import corpus
+
+
+def best_of(func, repeat=3, number=1):
+    """Best time per call of ``func`` over ``repeat`` runs of ``number`` calls"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+@contextmanager
+def scratch_filter():
+    """A ContentFilter whose files all live in a temporary directory"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            hosts_path = os.path.join(directory, "hosts")
+            with open(hosts_path, "w") as f:
+                f.write("127.0.0.1 localhost\n")
+            content_filter = ContentFilter(hosts_path=hosts_path)
+            content_filter.dns_flusher = BackgroundFlusher(NullFlusher())
+            content_filter.keywords.save_delay = 0
+            try:
+                yield content_filter
+            finally:
+                content_filter.close()
+        finally:
+            os.chdir(cwd)
+
+
+def bench_content(repeat, sizes):
+    results = []
+    for keyword_count in (10, 100, 1000, 10000):
+        lists = corpus.keyword_lists(keyword_count)
+        vocabulary = lists["explicit"] + lists["moderate"]
+        results.append(
+            {
+                "benchmark": "matcher_build",
+                "keywords": keyword_count,
+                "seconds": best_of(lambda: KeywordMatcher(lists), repeat),
+            }
+        )
+        with scratch_filter() as content_filter:
+            for category, words in lists.items():
+                content_filter.add_keywords(words, category)
+            content_filter.matcher  # build outside the timings
+            for size in (10_000, 100_000, 1_000_000):
+                content = corpus.text(size, vocabulary, seed=size)
+
+                def uncached():
+                    content_filter.score_cache = ScoreCache()
+                    content_filter.check_content("bench", content)
+
+                for name, func in (
+                    ("check_content", uncached),
+                    ("check_content_cached", lambda: content_filter.check_content("bench", content)),
+                ):
+                    results.append(
+                        {
+                            "benchmark": name,
+                            "keywords": keyword_count,
+                            "size": size,
+                            "seconds": best_of(func, repeat),
+                        }
+                    )
+    return results
+
+
+def bench_batch(repeat, sizes):
+    results = []
+    for keyword_count in (100, 1000, 10000):
+        lists = corpus.keyword_lists(keyword_count)
+        vocabulary = lists["explicit"] + lists["moderate"]
+        documents = [
+            corpus.text(5000, vocabulary, hit_rate, seed)
+            for seed, hit_rate in enumerate([0.0, 0.001, 0.01] * 85 + [0.0])
+        ]
+        with scratch_filter() as content_filter:
+            for category, words in lists.items():
+                content_filter.add_keywords(words, category)
+            content_filter.batch_scorer  # build outside the timings
+
+            def one_by_one():
+                content_filter.score_cache = ScoreCache()
+                for document in documents:
+                    content_filter.check_content("bench", document)
+
+            def batched():
+                content_filter.score_cache = ScoreCache()
+                content_filter.check_contents(documents)
+
+            for name, func in (("check_content_x256", one_by_one), ("check_contents_256", batched)):
+                results.append(
+                    {
+                        "benchmark": name,
+                        "keywords": keyword_count,
+                        "seconds": best_of(func, repeat),
+                    }
+                )
+    return results
+
+
+@contextmanager
+def page_server(pages):
+    """Serve {path: html} on a local port; yields the base URL"""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = pages[self.path.split("?", 1)[0]]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(http.server.ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # early exits drop connections mid-response
+
+    server = Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def bench_webpage(repeat, sizes):
+    lists = corpus.keyword_lists(1000)
+    vocabulary = lists["explicit"] + lists["moderate"]
+    pages = {}
+    for size in (100_000, 1_000_000):
+        # A clean page is read to the end; a flagged one stops early
+        pages[f"/clean/{size}"] = corpus.html_page(size, vocabulary, 0.0, size)
+        pages[f"/flagged/{size}"] = corpus.html_page(size, lists["explicit"], 0.01, size)
+    pages = {path: html.encode("utf-8") for path, html in pages.items()}
+
+    results = []
+    counter = itertools.count()
+    with scratch_filter() as content_filter, page_server(pages) as base:
+        for category, words in lists.items():
+            content_filter.add_keywords(words, category)
+        for path in pages:
+            for stream in (True, False):
+                # A fresh query string every call keeps the verdict cache out
+                def check():
+                    url = f"{base}{path}?{next(counter)}"
+                    content_filter.check_webpage(url, stream=stream)
+
+                check()  # warm up the connection pool
+                kind, size = path.strip("/").split("/")
+                results.append(
+                    {
+                        "benchmark": "check_webpage",
+                        "page": kind,
+                        "size": int(size),
+                        "stream": stream,
+                        "seconds": best_of(check, repeat),
+                    }
+                )
+    return results
+
+
+def bench_blocklist(repeat, sizes):
+    results = []
+    for size in sizes:
+        with scratch_filter() as content_filter:
+            content_filter.blocklist.add(corpus.host_names(size))
+            content_filter.blocklist.save()
+            content_filter.enable_blocking()
+            new_urls = iter(f"https://new{i}.example.org/" for i in itertools.count())
+            blocked = [f"https://{name}/" for name in corpus.host_names(size)]
+            to_unblock = iter(blocked)
+            lookups = blocked[:: max(1, size // 10000)]
+
+            for name, func, number in (
+                ("block_url", lambda: content_filter.block_url(next(new_urls)), 100),
+                ("unblock_url", lambda: content_filter.unblock_url(next(to_unblock)), 5),
+                ("get_blocked_urls", content_filter.get_blocked_urls, 1),
+                ("is_blocked", lambda: [content_filter.is_blocked(url) for url in lookups], 1),
+            ):
+                result = {
+                    "benchmark": name,
+                    "entries": size,
+                    "seconds": best_of(func, repeat, number),
+                }
+                if name == "is_blocked":
+                    result["seconds"] /= len(lookups)
+                results.append(result)
+    return results
+
+
+def bench_keywords(repeat, sizes):
+    results = []
+    for existing in (1000, 50000):
+        lists = corpus.keyword_lists(existing)
+        with scratch_filter() as content_filter:
+            for category, words in lists.items():
+                content_filter.add_keywords(words, category)
+            new_words = iter(corpus.words(existing + 100000, seed=7)[existing:])
+            bulk = iter(corpus.words(existing + 100000, seed=8)[existing:])
+
+            content_filter.keywords.save_delay = 1.0  # debounced, as in the app
+            results.append(
+                {
+                    "benchmark": "add_keyword",
+                    "keywords": existing,
+                    "seconds": best_of(
+                        lambda: content_filter.add_keyword(next(new_words)), repeat, 1000
+                    ),
+                }
+            )
+            results.append(
+                {
+                    "benchmark": "add_keywords_bulk_1000",
+                    "keywords": existing,
+                    "seconds": best_of(
+                        lambda: content_filter.add_keywords(
+                            [next(bulk) for _ in range(1000)]
+                        ),
+                        repeat,
+                    ),
+                }
+            )
+
+            def save():
+                content_filter.add_keyword(next(new_words))
+                content_filter.keywords.save()
+
+            results.append(
+                {
+                    "benchmark": "keywords_save",
+                    "keywords": existing,
+                    "seconds": best_of(save, repeat),
+                }
+            )
+    return results
+
+
+GROUPS = {
+    "content": bench_content,
+    "batch": bench_batch,
+    "webpage": bench_webpage,
+    "blocklist": bench_blocklist,
+    "keywords": bench_keywords,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=sorted(GROUPS))
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[10_000, 100_000],
+        help="hosts file sizes for the blocklist group",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for group in args.only or GROUPS:
+        for result in GROUPS[group](args.repeat, args.sizes):
+            params = " ".join(
+                f"{key}={value}"
+                for key, value in result.items()
+                if key not in ("benchmark", "seconds")
+            )
+            print(f"{result['benchmark']:<24} {params:<40} {result['seconds'] * 1000:10.3f} ms")
+            results.append(dict(result, group=group))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Measure application startup time.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_startup [--names N] [--keywords N]
+        [--repeat N] [--json FILE] [--budget MS]
+
+Every run starts a fresh interpreter in a scratch directory holding a
+deterministic blocklist and keyword file, so imports, file loading and
+window construction are all measured cold. The window is created on Qt's
+offscreen platform without the welcome dialog. With --budget the exit
+status is 1 when the best time until the filter is ready exceeds it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child interpreter; prints the window's startup_times as JSON
+CHILD = """
+import time
+started = time.perf_counter()
+import json, sys
+sys.path.insert(0, sys.argv[1])
+from PyQt5.QtWidgets import QApplication
+import blocker.gui as gui
+imported = time.perf_counter() - started
+gui.is_admin = lambda: True  # no admin warning dialog
+app = QApplication([])
+window = gui.BlockerWindow(show_welcome=False, started=started)
+window.loader.loaded.connect(lambda _: app.quit())
+window.loader.failed.connect(lambda _: app.quit())
+app.exec_()
+window.startup_times["imports"] = imported
+if window.content_filter is not None:
+    window.content_filter.close()
+print(json.dumps(window.startup_times))
+"""
+
+
+def make_data(directory, names=100000, keywords=1000):
+    """Write a blocklist store and keyword file into a directory"""
+    sys.path.insert(0, REPOSITORY)
+    from blocker.blocklist import Blocklist
+    from blocker.keywords import KeywordStore
+
+    blocklist = Blocklist(os.path.join(directory, "blocked_urls.bin"))
+    blocklist.add(f"site{i}.example.com" for i in range(names))
+    blocklist.save()
+    blocklist.compact()
+    blocklist.close()
+
+    store = KeywordStore(os.path.join(directory, "blocked_keywords.json"), save_delay=0)
+    store.add((f"keyword{i}" for i in range(keywords)), "explicit")
+
+
+def run_once(directory):
+    """Start the application once and return its startup timings"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, REPOSITORY],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(names=100000, keywords=1000, repeat=5):
+    """Best startup timings over ``repeat`` cold starts"""
+    with tempfile.TemporaryDirectory() as directory:
+        make_data(directory, names, keywords)
+        runs = [run_once(directory) for _ in range(repeat)]
+    return {
+        "names": names,
+        "keywords": keywords,
+        "repeat": repeat,
+        **{stage: min(r[stage] for r in runs) for stage in runs[0]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=100000)
+    parser.add_argument("--keywords", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument(
+        "--budget", type=float, help="fail if the filter takes longer (ms)"
+    )
+    args = parser.parse_args()
+
+    result = run(args.names, args.keywords, args.repeat)
+    for stage in ("imports", "window", "filter"):
+        print(f"{stage:<8} {result[stage] * 1000:8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.budget is not None and result["filter"] * 1000 > args.budget:
+        print(f"Startup exceeded the {args.budget:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Deterministic synthetic data for the benchmarks.
+
+Everything is derived from a seeded random.Random, so the same arguments
+always give the same corpus and results stay comparable across versions.
+"""
+import random
+
+_SYLLABLES = [
+    "ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pa", "qui", "dor",
+    "ben", "fal", "gro", "hux", "jin", "mol", "pex", "tor", "ul", "wex", "yo",
+]
+
+
+def words(count, seed=0):
+    """``count`` distinct lowercase words"""
+    rng = random.Random(seed)
+    result = {}
+    while len(result) < count:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        result[word] = None
+    return list(result)
+
+
+def keyword_lists(count, seed=0):
+    """{"explicit": [...], "moderate": [...]} with ``count`` keywords in all"""
+    vocabulary = words(count, seed + 1)
+    half = count // 2
+    return {"explicit": vocabulary[:half], "moderate": vocabulary[half:]}
+
+
+def text(size, vocabulary, hit_rate=0.001, seed=0):
+    """About ``size`` characters of filler words with some vocabulary hits"""
+    rng = random.Random(seed)
+    # No syllable contains a "c", so filler words never collide with keywords
+    filler = ["c" + word for word in words(500, seed + 2)]
+    parts = []
+    length = 0
+    while length < size:
+        if vocabulary and rng.random() < hit_rate:
+            word = rng.choice(vocabulary)
+        else:
+            word = rng.choice(filler)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def html_page(size, vocabulary, hit_rate=0.001, seed=0):
+    """An HTML page of about ``size`` characters wrapping ``text``"""
+    rng = random.Random(seed)
+    body = text(size, vocabulary, hit_rate, seed).split(" ")
+    parts = ["<html><head><title>Page</title><style>p{margin:0}</style></head><body>"]
+    index = 0
+    while index < len(body):
+        step = rng.randint(5, 60)
+        tag = rng.choice(["p", "div", "li", "td"])
+        parts.append(f"<{tag}>{' '.join(body[index:index + step])}</{tag}>")
+        index += step
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def host_names(count, seed=0):
+    """``count`` distinct host names"""
+    rng = random.Random(seed)
+    tlds = ["com", "net", "org", "io", "xyz"]
+    names = []
+    for i in range(count):
+        word = rng.choice(_SYLLABLES) + rng.choice(_SYLLABLES)
+        names.append(f"{word}{i}.{rng.choice(tlds)}")
+    return names
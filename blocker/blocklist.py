@@ -0,0 +1,197 @@
+import os
+import threading
+
+from .store import CompactStore
+
+
+class Blocklist:
+    """Set of blocked host names backed by a memory-mapped CompactStore.
+
+    The store holds the bulk of the names and loads in milliseconds.
+    Changes made since it was last rebuilt live in a small in-memory
+    overlay and are persisted to an append-only journal next to it
+    ("+name" / "-name" lines) that is replayed on load. Once the journal
+    grows past ``compact_threshold`` entries (or a tenth of the store),
+    ``save`` folds it into a freshly built store.
+
+    Lookups are O(1) for the overlay and a Bloom filter check plus binary
+    search for the store; ``find`` matches a host against its parent
+    domains with one lookup per label. Changes are kept in memory until
+    ``save``. Lookups are safe while another thread compacts: the new
+    store is built next to the old one and swapped in under a lock.
+    """
+
+    def __init__(self, path, import_path=None, compact_threshold=10000):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_threshold = compact_threshold
+        # Held by lookups and by compact while it swaps the store
+        self._lock = threading.RLock()
+
+        if not os.path.exists(path) and import_path and os.path.exists(import_path):
+            # One-off migration from the plain text list of older versions
+            with open(import_path, "r", encoding="utf-8") as f:
+                CompactStore.build(path, (line.strip() for line in f if line.strip()))
+        self._store = CompactStore(path)
+
+        # Names added on top of the store, and store names removed since
+        self._added = {}
+        self._removed = set()
+        self._journal_size = 0
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    name = line[1:].strip()
+                    if line.startswith("+"):
+                        self._add(name)
+                    elif line.startswith("-"):
+                        self._discard(name)
+                    self._journal_size += 1
+        except FileNotFoundError:
+            pass
+
+        # Names added or removed since the last save, and whether any were removed
+        self._touched = {}
+        self._pending_removed = False
+
+    def __contains__(self, name):
+        with self._lock:
+            return self._contains(name)
+
+    def _contains(self, name):
+        if name in self._added:
+            return True
+        return name not in self._removed and name in self._store
+
+    def __iter__(self):
+        removed = self._removed
+        for name in self._store:
+            if name not in removed:
+                yield name
+        yield from list(self._added)
+
+    def __len__(self):
+        return len(self._store) - len(self._removed) + len(self._added)
+
+    def find(self, host, subdomains=True):
+        """Return the listed name that blocks a host, or None.
+
+        With subdomains=True a listed parent domain also blocks the host,
+        so "a.b.example.com" is found through "example.com".
+        """
+        with self._lock:
+            if self._contains(host):
+                return host
+            if subdomains:
+                index = host.find(".")
+                while index != -1:
+                    parent = host[index + 1:]
+                    if self._contains(parent):
+                        return parent
+                    index = host.find(".", index + 1)
+        return None
+
+    def _add(self, name):
+        if name in self._removed:
+            self._removed.discard(name)
+        elif name in self._added or name in self._store:
+            return False
+        else:
+            self._added[name] = None
+        return True
+
+    def _discard(self, name):
+        if name in self._added:
+            del self._added[name]
+        elif name in self._store and name not in self._removed:
+            self._removed.add(name)
+        else:
+            return False
+        return True
+
+    def add(self, names):
+        """Add host names, ignoring ones already listed"""
+        added, removed, store, touched = (
+            self._added, self._removed, self._store, self._touched
+        )
+        for name in names:
+            if name in added:
+                continue
+            if name in removed:
+                removed.discard(name)
+            elif name in store:
+                continue
+            else:
+                added[name] = None
+            touched[name] = None
+
+    def discard(self, names):
+        """Remove host names that are listed"""
+        for name in names:
+            if self._discard(name):
+                self._touched[name] = None
+                self._pending_removed = True
+
+    def snapshot(self):
+        """Capture the current state for a later ``restore``"""
+        return (
+            dict(self._added),
+            set(self._removed),
+            dict(self._touched),
+            self._pending_removed,
+        )
+
+    def restore(self, snapshot):
+        """Return to a state captured with ``snapshot``"""
+        added, removed, touched, pending_removed = snapshot
+        self._added = dict(added)
+        self._removed = set(removed)
+        self._touched = dict(touched)
+        self._pending_removed = pending_removed
+
+    def save(self):
+        """Write pending changes to disk.
+
+        Returns the names added since the previous save and whether any
+        were removed, so callers can mirror the change elsewhere.
+        """
+        touched, removed = self._touched, self._pending_removed
+        added = [name for name in touched if name in self]
+        if touched:
+            limit = max(self.compact_threshold, len(self._store) // 10)
+            if self._journal_size + len(touched) > limit:
+                self.compact()
+            else:
+                # Journal the net effect of the batch on each touched name
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.writelines(
+                        ("+" if name in self else "-") + name + "\n"
+                        for name in touched
+                    )
+                self._journal_size += len(touched)
+        self._touched = {}
+        self._pending_removed = False
+        return added, removed
+
+    def compact(self):
+        """Fold the overlay into a rebuilt store and clear the journal"""
+        names = list(self)
+        new_path = self.path + ".new"
+        CompactStore.build(new_path, names)
+        del names
+        # Lookups keep using the old store and overlay until this swap
+        with self._lock:
+            # The store file cannot be replaced while it is mapped on Windows
+            self._store.close()
+            os.replace(new_path, self.path)
+            self._store = CompactStore(self.path)
+            self._added = {}
+            self._removed = set()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_size = 0
+
+    def close(self):
+        """Release the memory-mapped store"""
+        with self._lock:
+            self._store.close()
@@ -0,0 +1,167 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from .utils import load_json_file, normalize_url, save_json_file
+
+
+class VerdictCache:
+    """Size-bounded LRU of page verdicts with a TTL, persisted to disk.
+
+    Entries are keyed by normalized URL and hold (should_block, scores).
+    The cache is tied to a fingerprint of the keyword lists: a cache file
+    written for different keywords is discarded on load, and ``clear``
+    is called with the new fingerprint whenever the keywords change.
+
+    Changes are written at most every ``save_interval`` seconds by a
+    background timer (and by ``save``), never on the thread that stored
+    the verdict; a failed write is reported and retried on the next save.
+    """
+
+    def __init__(self, path, fingerprint, ttl=3600, max_entries=10000, save_interval=30):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self.fingerprint = fingerprint
+
+        # url -> (stored at, should_block, scores), least recent first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        # Serializes writes of the file; _lock only guards the entries
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+
+        data = load_json_file(path)
+        if data.get("fingerprint") == fingerprint:
+            now = time.time()
+            for url, (stored_at, should_block, scores) in data.get("entries", []):
+                if now - stored_at < ttl:
+                    for category, matches in scores["matches"].items():
+                        scores["matches"][category] = [tuple(m) for m in matches]
+                    self._entries[url] = (stored_at, should_block, scores)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, url):
+        """Return the cached (should_block, scores) for a URL, or None"""
+        key = normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)
+        return entry[1], copy.deepcopy(entry[2])
+
+    def put(self, url, should_block, scores):
+        """Store a verdict, evicting the least recently used entries"""
+        key = normalize_url(url)
+        with self._lock:
+            self._entries[key] = (time.time(), should_block, copy.deepcopy(scores))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            if self._save_timer is None and self.save_interval:
+                self._save_timer = threading.Timer(self.save_interval, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def clear(self, fingerprint=None):
+        """Drop every entry, optionally switching to a new keyword fingerprint"""
+        with self._lock:
+            if fingerprint is not None:
+                self.fingerprint = fingerprint
+            self._entries.clear()
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if it changed since the last save"""
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                data = {
+                    "fingerprint": self.fingerprint,
+                    "entries": [
+                        [url, list(entry)] for url, entry in self._entries.items()
+                    ],
+                }
+                self._dirty = False
+            try:
+                save_json_file(self.path, data)
+            except OSError as e:
+                print(f"Error saving verdict cache: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ScoreCache:
+    """LRU of content scores keyed by a hash of the scored text.
+
+    The key also carries the keyword-list version, so scores computed
+    before a keyword change are never returned afterwards. ``hits`` and
+    ``misses`` count lookups.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (digest, version) -> (should_block, scores), least recent first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content, version):
+        """Cache key for a text (or raw bytes) under a keyword-list version"""
+        if isinstance(content, str):
+            content = content.encode("utf-8", "surrogatepass")
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        return digest, version
+
+    def get(self, key):
+        """Return the cached (should_block, scores) for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry[0], copy.deepcopy(entry[1])
+
+    def put(self, key, should_block, scores):
+        """Store a result, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (should_block, copy.deepcopy(scores))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def __len__(self):
+        return len(self._entries)
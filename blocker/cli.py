@@ -0,0 +1,272 @@
+"""Command-line interface: python -m blocker <command> ...
+
+Runs on top of ContentFilter without Qt, for scripts and headless
+machines. Run ``python -m blocker --help`` for the commands.
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+
+from .extract import extract_text
+from .filter import ContentFilter
+from .profiling import PROFILE_ENV, profiler_from_env
+
+
+def read_urls(paths):
+    """Yield non-empty, non-comment lines from files, or stdin for "-"/none"""
+    for path in paths or ["-"]:
+        f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        try:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def cmd_scan(content_filter, args):
+    if args.max_bytes is not None:
+        content_filter.fetch_policy.max_bytes = args.max_bytes
+    content_filter.fetch_policy.head_first = args.head_first
+    failed = 0
+    flagged = []
+    results = content_filter.check_webpages(
+        read_urls(args.files),
+        max_workers=args.workers,
+        per_host_limit=args.per_host,
+        stream=not args.no_stream,
+        processes=args.processes,
+    )
+    for url, should_block, scores in results:
+        record = {"url": url, "blocked": should_block, **scores}
+        if should_block is None:
+            failed += 1
+        elif should_block and args.block:
+            flagged.append(url)
+        sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+    if flagged:
+        # One hosts file write and DNS flush for the whole scan
+        content_filter.block_urls(flagged)
+    return 1 if failed else 0
+
+
+def cmd_score(content_filter, args):
+    texts = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        texts.append(extract_text(text) if args.html else text)
+    results = content_filter.check_contents(
+        texts, batch_size=args.batch_size, processes=args.processes
+    )
+    for path, (should_block, scores) in zip(args.files, results):
+        record = {"file": path, "blocked": should_block, **scores}
+        sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+def cmd_block(content_filter, args):
+    urls = list(read_urls(args.urls)) if args.urls == ["-"] else args.urls
+    done = content_filter.block_urls(urls)
+    print(f"Blocked {done} of {len(urls)} URLs")
+    return 0 if done == len(urls) else 1
+
+
+def cmd_unblock(content_filter, args):
+    urls = list(read_urls(args.urls)) if args.urls == ["-"] else args.urls
+    done = content_filter.unblock_urls(urls)
+    print(f"Unblocked {done} of {len(urls)} URLs")
+    return 0 if done == len(urls) else 1
+
+
+def cmd_import(content_filter, args):
+    def progress(done, total):
+        if total:
+            sys.stderr.write(f"\r{done * 100 // total:3d}%")
+            sys.stderr.flush()
+
+    added = content_filter.import_blocklist(
+        args.file, None if args.quiet else progress
+    )
+    if not args.quiet:
+        sys.stderr.write("\n")
+    print(f"Added {added} entries to the blocklist")
+    return 0
+
+
+def cmd_list(content_filter, args):
+    for name in content_filter.get_blocked_urls():
+        print(name)
+    return 0
+
+
+def cmd_keywords(content_filter, args):
+    if args.action == "list":
+        keywords = content_filter.get_keywords()
+        categories = [args.category] if args.category else list(keywords)
+        for category in categories:
+            for keyword in keywords.get(category, []):
+                print(f"{category}\t{keyword}")
+        return 0
+    category = args.category or "explicit"
+    if args.action == "add":
+        changed = content_filter.add_keywords(args.keywords, category)
+        print(f"Added {changed} keywords to {category}")
+    else:
+        changed = content_filter.remove_keywords(args.keywords, category)
+        print(f"Removed {changed} keywords from {category}")
+    return 0
+
+
+def cmd_enable(content_filter, args):
+    return 0 if content_filter.enable_blocking() else 1
+
+
+def cmd_disable(content_filter, args):
+    return 0 if content_filter.disable_blocking() else 1
+
+
+def cmd_status(content_filter, args):
+    print(json.dumps(content_filter.stats()["gauges"], indent=2))
+    return 0
+
+
+def cmd_serve(content_filter, args):
+    """Keep blocking (and optionally metrics) running until interrupted"""
+    if args.metrics_port is not None:
+        host, port = content_filter.serve_metrics(("127.0.0.1", args.metrics_port))
+        print(f"Serving metrics on http://{host}:{port}/metrics")
+    if not content_filter.enable_blocking():
+        return 1
+    print("Blocking enabled; press Ctrl+C to stop")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    if args.keep:
+        return 0
+    return 0 if content_filter.disable_blocking() else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m blocker", description="NSFW Blocker without the GUI"
+    )
+    parser.add_argument("--hosts", help="hosts file to manage (default: the system's)")
+    parser.add_argument(
+        "--mode", choices=["hosts", "dns"], default="hosts", help="blocking mode"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=f"profile filter operations into DIR (or set ${PROFILE_ENV})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser(
+        "scan", help="check webpages and print one JSON line per URL"
+    )
+    scan.add_argument("files", nargs="*", help="files of URLs, one per line (default: stdin)")
+    scan.add_argument("--workers", type=int, default=16, help="pages fetched at once")
+    scan.add_argument("--per-host", type=int, default=4, help="pages fetched at once per host")
+    scan.add_argument("--no-stream", action="store_true", help="read whole pages before scoring")
+    scan.add_argument("--block", action="store_true", help="block pages that fail the check")
+    scan.add_argument(
+        "--max-bytes", type=int, help="read at most this much of each page (default: 5 MiB)"
+    )
+    scan.add_argument(
+        "--head-first", action="store_true", help="send HEAD to skip non-text pages before GET"
+    )
+    scan.add_argument(
+        "--processes", type=int, default=0,
+        help="worker processes that score fetched pages (default: score in the fetch threads)",
+    )
+    scan.set_defaults(handler=cmd_scan)
+
+    score = commands.add_parser(
+        "score", help="score local text files in batches and print one JSON line per file"
+    )
+    score.add_argument("files", nargs="+")
+    score.add_argument("--html", action="store_true", help="extract the text of HTML files first")
+    score.add_argument("--batch-size", type=int, default=64, help="files scored together")
+    score.add_argument(
+        "--processes", type=int, default=0, help="worker processes scoring batches in parallel"
+    )
+    score.set_defaults(handler=cmd_score)
+
+    block = commands.add_parser("block", help="block URLs or domains")
+    block.add_argument("urls", nargs="+", help='URLs, or "-" to read them from stdin')
+    block.set_defaults(handler=cmd_block)
+
+    unblock = commands.add_parser("unblock", help="unblock URLs or domains")
+    unblock.add_argument("urls", nargs="+", help='URLs, or "-" to read them from stdin')
+    unblock.set_defaults(handler=cmd_unblock)
+
+    import_ = commands.add_parser(
+        "import", help="block every domain in a domain, hosts or adblock list"
+    )
+    import_.add_argument("file")
+    import_.add_argument("--quiet", action="store_true", help="no progress output")
+    import_.set_defaults(handler=cmd_import)
+
+    list_ = commands.add_parser("list", help="print the blocklist")
+    list_.set_defaults(handler=cmd_list)
+
+    keywords = commands.add_parser("keywords", help="list, add or remove keywords")
+    keywords.add_argument("action", choices=["list", "add", "remove"])
+    keywords.add_argument("keywords", nargs="*")
+    keywords.add_argument("-c", "--category", help="keyword category (default: explicit)")
+    keywords.set_defaults(handler=cmd_keywords)
+
+    enable = commands.add_parser("enable", help="turn blocking on (hosts mode)")
+    enable.set_defaults(handler=cmd_enable)
+
+    disable = commands.add_parser("disable", help="turn blocking off (hosts mode)")
+    disable.set_defaults(handler=cmd_disable)
+
+    status = commands.add_parser("status", help="print blocking state and list sizes")
+    status.set_defaults(handler=cmd_status)
+
+    serve = commands.add_parser(
+        "serve", help="enable blocking and keep running until interrupted"
+    )
+    serve.add_argument(
+        "--metrics-port", type=int, help="also serve Prometheus metrics on this port"
+    )
+    serve.add_argument(
+        "--keep", action="store_true", help="leave blocking enabled on exit"
+    )
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "keywords" and args.action != "list" and not args.keywords:
+        print("No keywords given", file=sys.stderr)
+        return 2
+    if args.mode == "dns" and args.command in ("enable", "disable"):
+        # The resolver only runs while this process does
+        print(
+            'DNS mode blocks only while the process runs; use "serve" instead',
+            file=sys.stderr,
+        )
+        return 2
+
+    content_filter = ContentFilter(hosts_path=args.hosts, mode=args.mode)
+    profiler = profiler_from_env(args.profile)
+    if profiler is not None:
+        profiler.install(content_filter)
+    try:
+        return args.handler(content_filter, args)
+    finally:
+        content_filter.close()
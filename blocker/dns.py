@@ -0,0 +1,146 @@
+import platform
+import shutil
+import subprocess
+import threading
+import time
+
+
+class DnsFlusher:
+    """Strategy for making the OS resolver forget cached host lookups"""
+
+    def flush(self):
+        """Flush synchronously; return True on success"""
+        raise NotImplementedError
+
+
+class NullFlusher(DnsFlusher):
+    """Does nothing, for systems without a resolver cache to clear"""
+
+    def flush(self):
+        return True
+
+
+class CommandFlusher(DnsFlusher):
+    """Runs one or more commands that clear the resolver cache"""
+
+    def __init__(self, *commands):
+        self.commands = commands
+
+    def flush(self):
+        try:
+            for command in self.commands:
+                subprocess.run(command, check=True, capture_output=True)
+            return True
+        except Exception as e:
+            print(f"Error flushing DNS cache: {e}")
+            return False
+
+
+class WindowsFlusher(CommandFlusher):
+    """``ipconfig /flushdns``, without releasing/renewing the network lease"""
+
+    def __init__(self):
+        super().__init__(["ipconfig", "/flushdns"])
+
+
+class ResolvectlFlusher(CommandFlusher):
+    """systemd-resolved via ``resolvectl flush-caches``"""
+
+    def __init__(self):
+        super().__init__(["resolvectl", "flush-caches"])
+
+
+class NscdFlusher(CommandFlusher):
+    """Invalidate the nscd hosts cache"""
+
+    def __init__(self):
+        super().__init__(["nscd", "-i", "hosts"])
+
+
+class MacFlusher(CommandFlusher):
+    """Clear the macOS directory service and mDNSResponder caches"""
+
+    def __init__(self):
+        super().__init__(
+            ["dscacheutil", "-flushcache"], ["killall", "-HUP", "mDNSResponder"]
+        )
+
+
+class RecordingFlusher(DnsFlusher):
+    """Test double that records when it was asked to flush"""
+
+    def __init__(self, result=True):
+        self.result = result
+        self.calls = []
+
+    def flush(self):
+        self.calls.append(time.monotonic())
+        return self.result
+
+
+def default_flusher(system=None):
+    """Pick the flush strategy for the current system"""
+    system = system or platform.system()
+    if system == "Windows":
+        return WindowsFlusher()
+    if system == "Darwin":
+        return MacFlusher()
+    if system == "Linux":
+        if shutil.which("resolvectl"):
+            return ResolvectlFlusher()
+        if shutil.which("nscd"):
+            return NscdFlusher()
+    return NullFlusher()
+
+
+class BackgroundFlusher:
+    """Runs a DnsFlusher off the caller's thread, coalescing requests.
+
+    The first ``request`` starts a timer of ``window`` seconds; every
+    request made before it fires is served by the same single flush.
+    Flushes are timed as the "dns_flush" stage of ``stats`` if given.
+    """
+
+    def __init__(self, flusher, window=0.5, stats=None):
+        self.flusher = flusher
+        self.window = window
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _flush(self):
+        if self.stats is None:
+            return self.flusher.flush()
+        with self.stats.timer("dns_flush"):
+            ok = self.flusher.flush()
+        self.stats.increment("dns_flushes" if ok else "dns_flush_errors")
+        return ok
+
+    def request(self):
+        """Schedule a flush unless one is already pending"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.window, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        self._flush()
+
+    def flush_now(self):
+        """Flush synchronously, absorbing any pending request"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return self._flush()
+
+    def drain(self):
+        """Run a pending flush now, e.g. before exiting"""
+        with self._lock:
+            pending = self._timer is not None
+        if pending:
+            self.flush_now()
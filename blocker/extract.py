@@ -0,0 +1,182 @@
+import codecs
+import importlib.util
+import re
+from html.parser import HTMLParser
+
+
+# Elements whose contents are never visible page text
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+# Elements that separate words, so "<p>a</p><p>b</p>" reads "a b", not "ab"
+BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl",
+        "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2",
+        "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+        "option", "p", "pre", "section", "table", "td", "th", "title", "tr",
+        "ul",
+    }
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def incremental_decoder(encoding):
+    """Incremental decoder for a declared charset, falling back to UTF-8"""
+    try:
+        factory = codecs.getincrementaldecoder(encoding or "utf-8")
+    except LookupError:
+        factory = codecs.getincrementaldecoder("utf-8")
+    return factory(errors="replace")
+
+
+class _TextCollector:
+    """Shared text handling for the extractors below.
+
+    Drops the contents of SKIPPED_TAGS, turns BLOCK_TAGS boundaries into a
+    space and collapses runs of whitespace, also across chunk boundaries.
+    """
+
+    def _reset_text(self):
+        self._parts = []
+        self._skip_depth = 0
+        self._at_space = True
+
+    def _open(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._separate()
+
+    def _close(self, tag):
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._separate()
+
+    def _separate(self):
+        if not self._at_space:
+            self._parts.append(" ")
+            self._at_space = True
+
+    def _text(self, data):
+        if self._skip_depth:
+            return
+        text = _WHITESPACE.sub(" ", data)
+        if self._at_space and text.startswith(" "):
+            text = text[1:]
+        if text:
+            self._parts.append(text)
+            self._at_space = text.endswith(" ")
+
+    def pop_text(self):
+        """Return the text extracted since the last call"""
+        text = "".join(self._parts)
+        self._parts = []
+        return text
+
+
+class TextExtractor(_TextCollector, HTMLParser):
+    """Incremental HTML-to-text extractor that builds no document tree.
+
+    Feed decoded HTML in arbitrary chunks and call ``pop_text`` to take the
+    text that has been extracted so far.
+    """
+
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self._reset_text()
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag)
+
+    def handle_endtag(self, tag):
+        self._close(tag)
+
+    def handle_data(self, data):
+        self._text(data)
+
+
+class LxmlTextExtractor(_TextCollector):
+    """TextExtractor equivalent on lxml's event-driven parser (no tree)"""
+
+    def __init__(self):
+        # Imported here so that importing this module stays cheap
+        from lxml import etree
+
+        self._reset_text()
+        self._parser = etree.HTMLParser(target=_LxmlTarget(self))
+
+    def feed(self, data):
+        self._parser.feed(data)
+
+    def close(self):
+        self._parser.close()
+
+
+class _LxmlTarget:
+    """lxml parser target forwarding events to a LxmlTextExtractor"""
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+
+    def start(self, tag, attrib):
+        self.extractor._open(tag)
+
+    def end(self, tag):
+        self.extractor._close(tag)
+
+    def data(self, data):
+        self.extractor._text(data)
+
+    def close(self):
+        pass
+
+
+# lxml is optional; look for it without paying for the import up front
+if importlib.util.find_spec("lxml") is not None:
+    BACKENDS = ("lxml", "html.parser", "bs4")
+else:
+    BACKENDS = ("html.parser", "bs4")
+DEFAULT_BACKEND = BACKENDS[0]
+
+
+def make_extractor(backend=None):
+    """Return an incremental extractor for a streaming backend"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == "lxml":
+        if "lxml" not in BACKENDS:
+            raise ValueError("The lxml backend requires the lxml package")
+        return LxmlTextExtractor()
+    if backend == "html.parser":
+        return TextExtractor()
+    raise ValueError(f"Unknown streaming extraction backend: {backend}")
+
+
+def extract_text(html, backend=None):
+    """Extract visible text from a whole HTML document.
+
+    Falls back to BeautifulSoup if the fast extractor fails on the input,
+    or uses it directly with backend="bs4".
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == "bs4":
+        return soup_text(html)
+    extractor = make_extractor(backend)
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        return soup_text(html)
+    return extractor.pop_text().strip()
+
+
+def soup_text(html):
+    """Extract text with BeautifulSoup, skipping the same elements"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup(list(SKIPPED_TAGS)):
+        element.decompose()
+    return _WHITESPACE.sub(" ", soup.get_text(" ")).strip()
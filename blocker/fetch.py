@@ -0,0 +1,202 @@
+import codecs
+import copy
+import re
+import threading
+from collections import OrderedDict
+
+
+# Media types whose body is read as page text; anything else is skipped
+TEXT_TYPES = (
+    "text/",
+    "application/xhtml+xml",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+)
+
+_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE
+)
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def parse_content_type(value):
+    """Split a Content-Type header into (media type, charset or None)"""
+    if not value:
+        return None, None
+    media_type, _, params = value.partition(";")
+    charset = None
+    for param in params.split(";"):
+        name, _, param_value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = param_value.strip().strip("\"'") or None
+    return media_type.strip().lower() or None, charset
+
+
+def sniff_charset(prefix):
+    """Charset from a byte order mark or <meta> tag in the start of a page"""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    match = _META_CHARSET.search(prefix)
+    if match is None:
+        return None
+    encoding = match.group(1).decode("ascii")
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        return None
+    return encoding
+
+
+class FetchPolicy:
+    """What check_webpage is willing to download and how it decodes it.
+
+    At most ``max_bytes`` of a body are read; a longer page is scored on
+    that prefix and reported as truncated. Responses whose Content-Type is
+    not one of ``text_types`` (prefixes of media types) are not read at
+    all and reported as skipped, and with ``head_first`` a HEAD request
+    finds those before any GET. Bodies are decoded with the charset from
+    the Content-Type header, else one sniffed from the first
+    ``sniff_bytes`` (byte order mark or <meta> tag), else UTF-8 -- never
+    by statistical detection over the whole body.
+    """
+
+    def __init__(
+        self,
+        max_bytes=5 * 1024 * 1024,
+        text_types=TEXT_TYPES,
+        head_first=False,
+        sniff_bytes=4096,
+    ):
+        self.max_bytes = max_bytes
+        self.text_types = tuple(text_types)
+        self.head_first = head_first
+        self.sniff_bytes = sniff_bytes
+
+    def skip_reason(self, headers):
+        """Why a response with these headers should not be read, or None"""
+        media_type, _ = parse_content_type(headers.get("Content-Type"))
+        # Servers that send no type at all are given the benefit of the doubt
+        if media_type is None or media_type.startswith(self.text_types):
+            return None
+        return f"content type {media_type}"
+
+    def charset(self, headers, prefix):
+        """Charset to decode a body with, given its headers and first bytes"""
+        _, charset = parse_content_type(headers.get("Content-Type"))
+        if charset:
+            try:
+                codecs.lookup(charset)
+                return charset
+            except LookupError:
+                pass
+        return sniff_charset(prefix[: self.sniff_bytes]) or "utf-8"
+
+
+class PageFetcher:
+    """Pooled HTTP client for page checks.
+
+    Connections are kept alive in a shared requests.Session, every request
+    has a connect/read timeout, and each host gets at most
+    ``max_connections_per_host`` concurrent connections. Pages that came
+    with an ETag or Last-Modified header are revalidated with a
+    conditional request, and the verdict of the previous check is reused
+    when the server answers 304 Not Modified. ``requests`` is only
+    imported when the first request is made.
+    """
+
+    def __init__(
+        self,
+        connect_timeout=5.0,
+        read_timeout=15.0,
+        max_connections_per_host=4,
+        max_hosts=64,
+        max_validators=10000,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_connections_per_host = max_connections_per_host
+        self.max_hosts = max_hosts
+        self.max_validators = max_validators
+        self._session = None
+
+        # url -> (conditional request headers, verdict), least recent first
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.max_hosts,
+                        pool_maxsize=self.max_connections_per_host,
+                        pool_block=True,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def get(self, url, stream=True, conditional=True):
+        """Send a GET, made conditional if the page was seen before"""
+        headers = {}
+        if conditional:
+            with self._lock:
+                entry = self._validators.get(url)
+            if entry is not None:
+                headers.update(entry[0])
+        return self.session.get(
+            url, headers=headers, stream=stream, timeout=self.timeout
+        )
+
+    def head(self, url):
+        """Send a HEAD request, following redirects"""
+        return self.session.head(url, allow_redirects=True, timeout=self.timeout)
+
+    def previous_verdict(self, url):
+        """Return the verdict stored for a page that answered 304, if any"""
+        with self._lock:
+            entry = self._validators.get(url)
+            if entry is None:
+                return None
+            self._validators.move_to_end(url)
+        return copy.deepcopy(entry[1])
+
+    def remember(self, url, response, verdict):
+        """Store a page's validators together with the verdict it produced"""
+        headers = {}
+        if response.headers.get("ETag"):
+            headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+
+        with self._lock:
+            if not headers:
+                self._validators.pop(url, None)
+                return
+            self._validators[url] = (headers, copy.deepcopy(verdict))
+            self._validators.move_to_end(url)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+
+    def clear_verdicts(self):
+        """Forget all stored verdicts, e.g. after the keyword lists change"""
+        with self._lock:
+            self._validators.clear()
+
+    def close(self):
+        """Close all pooled connections"""
+        if self._session is not None:
+            self._session.close()
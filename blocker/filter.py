@@ -1,280 +1,1001 @@
-from python_hosts import Hosts, HostsEntry
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+import hashlib
 import os
 import platform
-import requests
-from bs4 import BeautifulSoup
-from .utils import load_json_file, save_json_file
-import re
-import subprocess
+import threading
 import time
+from .blocklist import Blocklist
+from .cache import ScoreCache, VerdictCache
+from .extract import extract_text, incremental_decoder, make_extractor
+from .dns import BackgroundFlusher, default_flusher
+from .fetch import FetchPolicy, PageFetcher
+from .hosts import HostsSection
+from .importer import iter_domains
+from .keywords import KeywordStore
+from .matcher import KeywordMatcher
+from .resolver import SinkholeResolver
+from .scoring import CATEGORY_WEIGHTS, BatchScorer, RunningScores, score_hits
+from .stats import MetricsServer, Stats, prometheus_text, write_prometheus_file
+from .workers import ScoringPool, expand
+
+
+class CheckCancelled(Exception):
+    """Raised when a page check is cancelled before it finishes"""
+
+
+class ImportCancelled(Exception):
+    """Raised inside import_blocklist when its ``cancelled`` callable fires"""
 
 
 class ContentFilter:
-    def __init__(self):
+    def __init__(self, hosts_path=None, mode="hosts"):
+        """Create a filter.
+
+        mode="hosts" blocks through a section of the hosts file; mode="dns"
+        instead runs a local sinkhole resolver (see blocker.resolver) on
+        dns_address while blocking is enabled, which answers blocked names
+        and their subdomains straight from the blocklist and forwards the
+        rest to dns_upstream.
+        """
+        if mode not in ("hosts", "dns"):
+            raise ValueError(f"Unknown blocking mode: {mode}")
+        self.mode = mode
         self.system = platform.system()
-        if self.system == "Windows":
+        # Stage timings and event counters, see stats()
+        self.metrics = Stats()
+        self.metrics_server = None
+        if hosts_path:
+            self.hosts_path = hosts_path
+        elif self.system == "Windows":
             self.hosts_path = r"C:\Windows\System32\drivers\etc\hosts"
         else:
             self.hosts_path = "/etc/hosts"
 
-        # Store original hosts file content
-        with open(self.hosts_path, "r") as f:
-            self.original_hosts = f.read()
-
-        self.hosts = Hosts(path=self.hosts_path)
+        # Blocked hosts live in their own file; the hosts file only carries
+        # a copy of them in a marked section while blocking is enabled
+        self.blocklist_file = "blocked_urls.bin"
+        self.blocklist = Blocklist(self.blocklist_file, import_path="blocked_urls.txt")
+        self.hosts = HostsSection(self.hosts_path)
+        # Local resolver settings and instance for mode="dns"
+        self.dns_address = ("127.0.0.1", 53)
+        self.dns_upstream = ("1.1.1.1", 53)
+        self.resolver = None
+        # Guards the blocklist and hosts file writes, which may come from a timer
+        self._hosts_lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_snapshot = None
+        self._pending_write = False
+        self._commit_timer = None
+        # How the OS resolver cache is cleared after hosts file changes
+        self.dns_flusher = BackgroundFlusher(
+            default_flusher(self.system), stats=self.metrics
+        )
+        # Seconds to wait for more changes before writing the hosts file
+        # after a single block_url/unblock_url; 0 writes immediately
+        self.commit_delay = 0
 
-        # Load keywords
+        # Load keywords; changes are saved in the background
         self.keywords_file = "blocked_keywords.json"
-        self.keywords = load_json_file(
-            self.keywords_file, default={"explicit": [], "moderate": []}
+        self.keywords = KeywordStore(self.keywords_file)
+        self._matcher = None
+        self._matcher_version = None
+        # Score per hit for each category, and per (category, keyword)
+        # overrides of it; used by check_content and check_contents alike.
+        # Both are part of keywords_version and keywords_fingerprint, so
+        # changing them retires cached scores and verdicts
+        self.category_weights = dict(CATEGORY_WEIGHTS)
+        self.keyword_weights = {}
+        self._batch_scorer = None
+
+        # Pooled HTTP session with timeouts for page checks
+        self.fetcher = PageFetcher()
+        # Byte budget, content types and charset handling for page checks
+        self.fetch_policy = FetchPolicy()
+        # Bytes read per step when streaming a page in check_webpage
+        self.chunk_size = 64 * 1024
+        # HTML text extraction backend: "lxml", "html.parser", "bs4" or
+        # None for the fastest one installed
+        self.html_backend = None
+        # Recent page verdicts, kept across restarts
+        self.verdict_cache = VerdictCache(
+            "verdict_cache.json", self.keywords_fingerprint()
+        )
+        # Scores of recently checked texts, so identical content is scored once
+        self.score_cache = ScoreCache()
+        # Worker processes that decode, extract and score pages for
+        # check_webpages and check_contents, so bulk checks use every core
+        # while the I/O threads keep fetching; 0 scores on the calling
+        # threads
+        self.scoring_processes = 0
+        self._scoring_pool = None
+        self._scoring_pool_lock = threading.Lock()
+
+        # A section left behind by an earlier run means blocking is still on
+        self.is_active = mode == "hosts" and self.hosts.is_installed()
+
+    def _weights_key(self):
+        """Hashable copy of category_weights and keyword_weights"""
+        return (
+            tuple(self.category_weights.items()),
+            tuple(sorted(self.keyword_weights.items())),
         )
 
-        self.is_active = False
-
-    def flush_dns_cache(self):
-        """Flush the DNS cache to ensure hosts file changes take effect"""
-        try:
-            if self.system == "Windows":
-                # Run multiple DNS-related commands to ensure cache is cleared
-                subprocess.run(
-                    ["ipconfig", "/flushdns"], check=True, capture_output=True
+    @property
+    def keywords_version(self):
+        """Changes with every keyword or weight change; part of the content cache key"""
+        return self.keywords.version, self._weights_key()
+
+    @property
+    def matcher(self):
+        """Keyword matcher for the current keyword lists, rebuilt on change"""
+        version = self.keywords.version
+        if self._matcher is None or self._matcher_version != version:
+            self._matcher = KeywordMatcher(self.keywords.as_dict())
+            self._matcher_version = version
+        return self._matcher
+
+    @property
+    def batch_scorer(self):
+        """BatchScorer for the current matcher and weights, rebuilt on change"""
+        matcher = self.matcher
+        scorer = self._batch_scorer
+        if (
+            scorer is None
+            or scorer.matcher is not matcher
+            or scorer.category_weights != self.category_weights
+            or scorer.keyword_weights != self.keyword_weights
+        ):
+            scorer = BatchScorer(matcher, self.category_weights, self.keyword_weights)
+            self._batch_scorer = scorer
+        return scorer
+
+    def scoring_pool(self, processes=None):
+        """ScoringPool for the current matcher and settings.
+
+        The workers are started on first use and restarted when the
+        keywords, weights or HTML backend change.
+        """
+        matcher = self.matcher
+        with self._scoring_pool_lock:
+            pool = self._scoring_pool
+            if pool is None or not pool.is_current(
+                matcher,
+                processes,
+                self.category_weights,
+                self.keyword_weights,
+                self.html_backend,
+            ):
+                if pool is not None:
+                    pool.close(wait=False)
+                pool = ScoringPool(
+                    matcher,
+                    processes,
+                    self.category_weights,
+                    self.keyword_weights,
+                    self.html_backend,
                 )
-                subprocess.run(
-                    ["ipconfig", "/release"], check=True, capture_output=True
-                )
-                subprocess.run(["ipconfig", "/renew"], check=True, capture_output=True)
-                time.sleep(2)  # Give some time for DNS to update
-            else:
-                # For Linux/Mac, you might need different commands or sudo
-                pass
-            return True
-        except Exception as e:
-            print(f"Error flushing DNS cache: {e}")
+                self._scoring_pool = pool
+            return pool
+
+    def _keywords_changed(self):
+        """Drop verdicts scored with the old keyword lists"""
+        self.fetcher.clear_verdicts()
+        self.verdict_cache.clear(self.keywords_fingerprint())
+
+    def keywords_fingerprint(self):
+        """Digest of the keyword lists and weights, used to tie cached verdicts to them"""
+        fingerprint = self.keywords.fingerprint()
+        weights = self._weights_key()
+        if weights == (tuple(CATEGORY_WEIGHTS.items()), ()):
+            # Default weights keep the fingerprint of earlier versions
+            return fingerprint
+        digest = hashlib.blake2b(repr(weights).encode("utf-8"), digest_size=16)
+        return f"{fingerprint}-{digest.hexdigest()}"
+
+    def stats(self):
+        """Stage timings, event counters and cache and list sizes.
+
+        Timers (seconds) cover fetch, decode, extract, match, hosts_write
+        and dns_flush; counters include checks, checks_blocked, blocks,
+        unblocks, errors, pages_skipped, pages_truncated and verdict/score
+        cache hits and misses.
+        """
+        snapshot = self.metrics.snapshot()
+        score_cache = self.score_cache.stats()
+        snapshot["counters"]["score_cache_hits"] = score_cache["hits"]
+        snapshot["counters"]["score_cache_misses"] = score_cache["misses"]
+        snapshot["gauges"] = {
+            "blocklist_entries": len(self.blocklist),
+            "keywords": sum(len(words) for words in self.keywords.values()),
+            "verdict_cache_entries": len(self.verdict_cache),
+            "score_cache_entries": score_cache["entries"],
+            "blocking_active": int(self.is_active),
+        }
+        return snapshot
+
+    def metrics_text(self):
+        """stats() in Prometheus text format"""
+        snapshot = self.stats()
+        return prometheus_text(snapshot, snapshot["gauges"])
+
+    def write_metrics(self, path):
+        """Write stats() to a Prometheus textfile-collector file"""
+        write_prometheus_file(path, self.metrics_text())
+
+    def serve_metrics(self, address=("127.0.0.1", 9464)):
+        """Serve stats() for Prometheus at http://address/metrics"""
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics_text, address)
+            self.metrics_server.start()
+        return self.metrics_server.server_address
+
+    def _log_error(self, action, error):
+        """Report a failed operation and count it"""
+        self.metrics.increment("errors")
+        print(f"Error {action}: {error}")
+
+    def close(self):
+        """Persist cached state and release network resources"""
+        self.commit()
+        self._stop_resolver()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.dns_flusher.drain()
+        self.keywords.save()
+        self.verdict_cache.save()
+        self.fetcher.close()
+        self.blocklist.close()
+        if self._scoring_pool is not None:
+            self._scoring_pool.close()
+            self._scoring_pool = None
+
+    def flush_dns_cache(self, wait=False):
+        """Flush the DNS cache to ensure hosts file changes take effect.
+
+        By default the flush runs in the background and requests made in
+        quick succession share one flush. Pass wait=True to flush now and
+        get the result.
+        """
+        if wait:
+            return self.dns_flusher.flush_now()
+        self.dns_flusher.request()
+        return True
+
+    @staticmethod
+    def _url_host(url):
+        """Reduce a URL to the domain or IP address it points at"""
+        # Remove http:// or https:// if present
+        url = url.replace("http://", "").replace("https://", "")
+        # Remove path components, keep only domain or IP
+        return url.split("/")[0].lower()
+
+    @staticmethod
+    def _is_ip(host):
+        """Check if the host is an IP address"""
+        # Domain names end in a letter, so skip the full check for them
+        last = host.rstrip(".")[-1:]
+        if last and not last.isdigit():
             return False
+        return all(
+            part.isdigit() and 0 <= int(part) <= 255
+            for part in host.split(".")
+            if part
+        )
+
+    def _block_names(self, host):
+        """Names to add to the blocklist for a domain or IP address"""
+        if self._is_ip(host):
+            # For IP addresses, map localhost to the IP
+            return [host]
+        # For domains, block both www and non-www versions
+        if host.startswith("www."):
+            return [host]
+        return [host, "www." + host]
 
     def block_url(self, url):
-        """Add a URL to the hosts file to block it"""
+        """Add a URL to the blocklist and the hosts file to block it"""
         try:
-            # Remove http:// or https:// if present
-            url = url.replace("http://", "").replace("https://", "")
-            # Remove path components, keep only domain or IP
-            url = url.split("/")[0]
-
-            # Check if the URL is an IP address
-            is_ip = all(
-                part.isdigit() and 0 <= int(part) <= 255
-                for part in url.split(".")
-                if part
-            )
-
-            if is_ip:
-                # For IP addresses, map localhost to the IP
-                entries = [
-                    HostsEntry(entry_type="ipv4", address="127.0.0.1", names=[url])
-                ]
-            else:
-                # For domains, block both www and non-www versions
-                urls_to_block = [url]
-                if not url.startswith("www."):
-                    urls_to_block.append("www." + url)
-
-                entries = [
-                    HostsEntry(entry_type="ipv4", address="127.0.0.1", names=[u])
-                    for u in urls_to_block
-                ]
+            names = self._block_names(self._url_host(url))
 
-            self.hosts.add(entries)
-            if self.is_active:
-                self.hosts.write()
-                self.flush_dns_cache()
+            with self._hosts_lock:
+                self.blocklist.add(names)
+                self._hosts_changed()
+            self.metrics.increment("blocks")
             return True
         except Exception as e:
-            print(f"Error blocking URL: {e}")
+            self._log_error("blocking URL", e)
             return False
 
+    def url_names(self, url):
+        """Blocklist names that stand for a URL: its host with and without www."""
+        host = self._url_host(url)
+        if self._is_ip(host):
+            return [host]
+        if host.startswith("www."):
+            return [host, host[4:]]
+        return [host, "www." + host]
+
     def unblock_url(self, url):
-        """Remove a URL from the hosts file"""
+        """Remove a URL from the blocklist and the hosts file"""
         try:
-            url = url.replace("http://", "").replace("https://", "")
-            url = url.split("/")[0]
-
-            # Check if the URL is an IP address
-            is_ip = all(
-                part.isdigit() and 0 <= int(part) <= 255
-                for part in url.split(".")
-                if part
-            )
+            names = self.url_names(url)
 
-            if is_ip:
-                # For IP addresses, just remove the entry
-                self.hosts.remove_all_matching(name=url)
-            else:
-                # For domains, remove both www and non-www versions
-                if url.startswith("www."):
-                    base_url = url[4:]
-                    self.hosts.remove_all_matching(name=url)
-                    self.hosts.remove_all_matching(name=base_url)
-                else:
-                    self.hosts.remove_all_matching(name=url)
-                    self.hosts.remove_all_matching(name="www." + url)
-
-            if self.is_active:
-                self.hosts.write()
-                self.flush_dns_cache()
+            with self._hosts_lock:
+                self.blocklist.discard(names)
+                self._hosts_changed()
+            self.metrics.increment("unblocks")
             return True
         except Exception as e:
-            print(f"Error unblocking URL: {e}")
+            self._log_error("unblocking URL", e)
+            return False
+
+    def block_urls(self, urls):
+        """Block many URLs with a single hosts file write and DNS flush.
+
+        Returns the number of URLs that were blocked.
+        """
+        try:
+            with self.transaction():
+                return sum(1 for url in urls if self.block_url(url))
+        except Exception as e:
+            self._log_error("blocking URLs", e)
+            return 0
+
+    def unblock_urls(self, urls):
+        """Unblock many URLs with a single hosts file write and DNS flush.
+
+        Returns the number of URLs that were unblocked.
+        """
+        try:
+            with self.transaction():
+                return sum(1 for url in urls if self.unblock_url(url))
+        except Exception as e:
+            self._log_error("unblocking URLs", e)
+            return 0
+
+    def import_blocklist(self, path, progress=None, cancelled=None):
+        """Block every host listed in a file.
+
+        Plain domain/URL lists, hosts-format files and adblock-style
+        ``||domain^`` lists are read line by line, deduplicated and
+        committed with one hosts file write and one DNS flush.
+        ``progress(bytes_read, total_bytes)`` is called while reading.
+        ``cancelled`` is an optional callable polled between batches; once
+        it returns True the import is rolled back. Returns the number of
+        names newly added to the blocklist (0 if cancelled).
+        """
+        try:
+            with self.transaction():
+                before = len(self.blocklist)
+                batch = []
+                for host in iter_domains(path, progress):
+                    batch.extend(self._block_names(host))
+                    if len(batch) >= 10000:
+                        if cancelled is not None and cancelled():
+                            raise ImportCancelled(path)
+                        with self._hosts_lock:
+                            self.blocklist.add(batch)
+                        batch = []
+                with self._hosts_lock:
+                    self.blocklist.add(batch)
+                    self._hosts_changed()
+                return len(self.blocklist) - before
+        except ImportCancelled:
+            return 0
+        except Exception as e:
+            self._log_error("importing blocklist", e)
+            return 0
+
+    @contextmanager
+    def transaction(self):
+        """Group hosts changes into one hosts file write and one DNS flush.
+
+        block_url/unblock_url calls inside the block only change the
+        in-memory blocklist; the outermost transaction writes it out when
+        it exits. If the block raises, the changes are rolled back.
+
+        The hosts lock is held until the transaction exits, so changes
+        from other threads wait for it instead of joining its batch and
+        being rolled back with it.
+        """
+        with self._hosts_lock:
+            if self._batch_depth == 0:
+                # A debounced write from before would otherwise fire inside
+                # the transaction; the exit writes its changes instead
+                if self._commit_timer is not None:
+                    self._commit_timer.cancel()
+                    self._commit_timer = None
+                self._batch_snapshot = (self.blocklist.snapshot(), self._pending_write)
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    snapshot, pending_write = self._batch_snapshot
+                    self.blocklist.restore(snapshot)
+                    self._batch_snapshot = None
+                    self._pending_write = False
+                    if pending_write:
+                        # Changes from before the transaction still need writing
+                        self._hosts_changed()
+                raise
+            else:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._batch_snapshot = None
+                    if self._pending_write:
+                        self._write_hosts()
+
+    def _hosts_changed(self):
+        """Write blocklist changes now, after the batch, or debounced"""
+        self._pending_write = True
+        if self._batch_depth:
+            return
+        if self.commit_delay:
+            # Restart the timer so a burst of changes is written once
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+            self._commit_timer = threading.Timer(self.commit_delay, self.commit)
+            self._commit_timer.daemon = True
+            self._commit_timer.start()
+        else:
+            self._write_hosts()
+
+    def _write_hosts(self):
+        """Save the blocklist and mirror the change into the hosts file"""
+        self._pending_write = False
+        added, removed = self.blocklist.save()
+        # The sinkhole resolver reads the blocklist directly, so in DNS mode
+        # changes apply without touching the hosts file or the DNS cache
+        if self.mode == "dns" or not self.is_active or not (added or removed):
+            return
+        with self.metrics.timer("hosts_write"):
+            if removed:
+                self.hosts.write(self.blocklist)
+            else:
+                self.hosts.append(added)
+        self.flush_dns_cache()
+
+    def commit(self):
+        """Write any debounced blocklist changes right away.
+
+        Does nothing inside a transaction, whose exit writes anyway.
+        """
+        with self._hosts_lock:
+            if self._commit_timer is not None:
+                self._commit_timer.cancel()
+                self._commit_timer = None
+            if not self._pending_write or self._batch_depth:
+                return
+            try:
+                self._write_hosts()
+            except Exception as e:
+                self._log_error("writing hosts file", e)
+
+    def is_blocked(self, url):
+        """Check if a URL or host is blocked, directly or via a parent domain"""
+        # Without a scheme, reduce the input the same way block_url does
+        host = urlsplit(url).hostname if "://" in url else self._url_host(url)
+        host = (host or "").lower().rstrip(".")
+        if not host:
             return False
+        # IP addresses have no parent domains
+        return self.blocklist.find(host, subdomains=not self._is_ip(host)) is not None
 
     def get_blocked_urls(self):
-        """Get list of currently blocked URLs from hosts file"""
-        blocked = []
-        for entry in self.hosts.entries:
-            if entry.entry_type == "ipv4" and entry.address == "127.0.0.1":
-                blocked.extend(entry.names)
-        return blocked
+        """Get list of currently blocked URLs"""
+        with self._hosts_lock:
+            return list(self.blocklist)
 
     def enable_blocking(self):
-        """Enable content blocking by writing to hosts file"""
+        """Enable content blocking by writing the blocklist to the hosts file"""
         try:
-            # Write current hosts configuration
-            self.hosts.write()
-            self.is_active = True
+            with self._hosts_lock:
+                self.commit()
+                if self.mode == "dns":
+                    self._start_resolver()
+                    self.is_active = True
+                    return True
+                with self.metrics.timer("hosts_write"):
+                    self.hosts.write(self.blocklist)
+                self.is_active = True
             self.flush_dns_cache()
             return True
         except Exception as e:
-            print(f"Error enabling blocking: {e}")
+            self._log_error("enabling blocking", e)
             return False
 
     def disable_blocking(self):
-        """Disable content blocking by restoring original hosts file"""
+        """Disable content blocking by removing our section from the hosts file"""
         try:
-            # First, restore the original hosts file
-            with open(self.hosts_path, "w") as f:
-                f.write(self.original_hosts)
+            with self._hosts_lock:
+                # Save pending changes so the blocklist is kept for next time
+                self.commit()
+                if self.mode == "dns":
+                    self._stop_resolver()
+                    self.is_active = False
+                    return True
+                self.hosts.remove()
+                self.is_active = False
 
-            # Reset the hosts object to match the original state
-            self.hosts = Hosts(path=self.hosts_path)
-            self.is_active = False
-
-            # Aggressively flush DNS cache
             self.flush_dns_cache()
-
-            # Double-check if file was restored correctly
-            with open(self.hosts_path, "r") as f:
-                current_content = f.read()
-                if current_content.strip() != self.original_hosts.strip():
-                    raise Exception("Hosts file not properly restored")
-
             return True
         except Exception as e:
-            print(f"Error disabling blocking: {e}")
+            self._log_error("disabling blocking", e)
             return False
 
+    def _start_resolver(self):
+        """Start the local sinkhole resolver used in DNS mode"""
+        if self.resolver is None:
+            self.resolver = SinkholeResolver(
+                self.is_blocked, upstream=self.dns_upstream, address=self.dns_address
+            )
+        self.resolver.start()
+
+    def _stop_resolver(self):
+        """Stop the local sinkhole resolver, if it is running"""
+        if self.resolver is not None:
+            self.resolver.stop()
+            self.resolver = None
+
     def add_keyword(self, keyword, category="explicit"):
         """Add a keyword to block"""
-        if category not in self.keywords:
-            self.keywords[category] = []
-        if keyword not in self.keywords[category]:
-            self.keywords[category].append(keyword)
-            save_json_file(self.keywords_file, self.keywords)
-            return True
-        return False
+        return self.add_keywords([keyword], category) > 0
 
     def remove_keyword(self, keyword, category="explicit"):
         """Remove a keyword from blocking"""
-        if category in self.keywords and keyword in self.keywords[category]:
-            self.keywords[category].remove(keyword)
-            save_json_file(self.keywords_file, self.keywords)
-            return True
-        return False
+        return self.remove_keywords([keyword], category) > 0
+
+    def add_keywords(self, keywords, category="explicit"):
+        """Add many keywords at once; return how many were new"""
+        added = self.keywords.add(keywords, category)
+        if added:
+            self._keywords_changed()
+        return added
+
+    def remove_keywords(self, keywords, category="explicit"):
+        """Remove many keywords at once; return how many were listed"""
+        removed = self.keywords.discard(keywords, category)
+        if removed:
+            self._keywords_changed()
+        return removed
 
     def get_keywords(self, category=None):
         """Get list of blocked keywords"""
         if category:
-            return self.keywords.get(category, [])
-        return self.keywords
+            return list(self.keywords.get(category, ()))
+        return self.keywords.as_dict()
+
+    def score_matches(self, counts):
+        """Turn keyword hit counts into a blocking decision and detailed scores"""
+        # The matcher's copy of the lists is the one the counts came from
+        return score_hits(
+            self.matcher.keywords, counts, self.category_weights, self.keyword_weights
+        )
 
     def check_content(self, url, content):
         """Check if content contains blocked keywords and return detailed scores"""
         try:
+            # Identical text scored under the same keywords gives the same result
+            key = self.score_cache.key(content, self.keywords_version)
+            cached = self.score_cache.get(key)
+            if cached is not None:
+                return cached
+
             # Convert content to lowercase for case-insensitive matching
             content = content.lower()
-            total_words = len(content.split())
-
-            # Initialize scores dictionary
-            scores = {
-                "explicit": 0.0,
-                "moderate": 0.0,
-                "safe": 1.0,  # Start with assumption of safe
-                "matches": {"explicit": [], "moderate": []},
-            }
-
-            # Check explicit keywords
-            explicit_keywords = self.keywords.get("explicit", [])
-            for keyword in explicit_keywords:
-                if keyword.lower() in content:
-                    matches = len(
-                        re.findall(r"\b" + re.escape(keyword.lower()) + r"\b", content)
-                    )
-                    if matches > 0:
-                        scores["matches"]["explicit"].append((keyword, matches))
-                        # Each explicit keyword hit reduces safety score significantly
-                        scores["explicit"] += 0.3 * matches
-
-            # Check moderate keywords
-            moderate_keywords = self.keywords.get("moderate", [])
-            for keyword in moderate_keywords:
-                if keyword.lower() in content:
-                    matches = len(
-                        re.findall(r"\b" + re.escape(keyword.lower()) + r"\b", content)
-                    )
-                    if matches > 0:
-                        scores["matches"]["moderate"].append((keyword, matches))
-                        # Each moderate keyword hit has less impact
-                        scores["moderate"] += 0.15 * matches
-
-            # Normalize scores
-            total_score = scores["explicit"] + scores["moderate"]
-            if total_score > 1.0:
-                scores["explicit"] = min(1.0, scores["explicit"])
-                scores["moderate"] = min(1.0, scores["moderate"])
-                scores["safe"] = 0.0
-            else:
-                scores["safe"] = max(0.0, 1.0 - total_score)
-
-            # Determine if content should be blocked
-            should_block = scores["explicit"] >= 0.3 or scores["moderate"] >= 0.45
 
+            # Count every explicit and moderate hit in one pass
+            with self.metrics.timer("match"):
+                should_block, scores = self.score_matches(self.matcher.count(content))
+            self.score_cache.put(key, should_block, scores)
             return should_block, scores
 
         except Exception as e:
-            print(f"Error checking content: {e}")
-            return False, {
-                "explicit": 0.0,
-                "moderate": 0.0,
-                "safe": 1.0,
-                "matches": {"explicit": [], "moderate": []},
-            }
-
-    def check_webpage(self, url):
-        """Check if a webpage contains inappropriate content"""
+            self._log_error("checking content", e)
+            return False, empty_scores()
+
+    def check_contents(self, contents, batch_size=64, processes=None):
+        """check_content for many texts, scored in batches with NumPy.
+
+        Returns one (should_block, scores) per text, in order, with the
+        same results check_content gives. Texts already in the score cache
+        are not scored again; the rest go through batch_scorer
+        ``batch_size`` at a time, which bounds the size of the documents x
+        keywords count matrix. With ``processes`` (default:
+        scoring_processes) worker processes score the batches in parallel.
+        """
+        contents = list(contents)
+        if processes is None:
+            processes = self.scoring_processes
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Check text content
-            text_content = soup.get_text()
-            is_inappropriate, scores = self.check_content(url, text_content)
+            version = self.keywords_version
+            keys = [self.score_cache.key(content, version) for content in contents]
+            results = [self.score_cache.get(key) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is None]
+            batches = [
+                missing[start:start + batch_size]
+                for start in range(0, len(missing), batch_size)
+            ]
+
+            if batches and processes:
+                pool = self.scoring_pool(processes)
+                futures = [
+                    pool.submit_batch(contents[i] for i in batch) for batch in batches
+                ]
+                scored = []
+                for batch, future in zip(batches, futures):
+                    compact, seconds = future.result()
+                    self.metrics.record("match", seconds, len(batch))
+                    scored.append([expand(result) for result in compact])
+            else:
+                scored = []
+                for batch in batches:
+                    begin = time.perf_counter()
+                    scored.append(
+                        self.batch_scorer.score([contents[i].lower() for i in batch])
+                    )
+                    self.metrics.record("match", time.perf_counter() - begin, len(batch))
 
-            # Return both the blocking decision and the scores
-            return is_inappropriate, scores
+            for batch, verdicts in zip(batches, scored):
+                for i, (should_block, scores) in zip(batch, verdicts):
+                    self.score_cache.put(keys[i], should_block, scores)
+                    results[i] = (should_block, scores)
+            return results
 
         except Exception as e:
-            print(f"Error checking webpage: {e}")
-            return False, {
-                "explicit": 0.0,
-                "moderate": 0.0,
-                "safe": 1.0,
-                "matches": {"explicit": [], "moderate": []},
-            }
+            self._log_error("checking contents", e)
+            return [(False, empty_scores()) for _ in contents]
+
+    def check_webpage(self, url, stream=True, cancelled=None):
+        """Check if a webpage contains inappropriate content.
+
+        In streaming mode the body is read in chunks and scored as it
+        arrives, and reading stops as soon as the page crosses the blocking
+        threshold. Pass stream=False to parse the whole page at once.
+        Either way fetch_policy limits what is read: the body is cut off
+        at max_bytes, non-text content types are not read at all, and the
+        charset comes from the headers or the start of the page. Which of
+        these applied is reported in scores["fetch"] (see _fetch_report);
+        skipped pages are not blocked but have a safe score of 0.
+        Verdicts are cached per normalized URL for verdict_cache.ttl
+        seconds, and pages that are unchanged since the last check (HTTP
+        304) reuse the previous verdict. HTTP errors (status 400 and up) fail
+        the check like a network error and are not cached.
+
+        ``cancelled`` is an optional callable polled before the request and
+        between chunks; once it returns True the check stops and raises
+        CheckCancelled, and nothing is cached for the page.
+        """
+        try:
+            return self._check_webpage(url, stream, cancelled)
+        except CheckCancelled:
+            raise
+        except Exception as e:
+            self._log_error("checking webpage", e)
+            return False, empty_scores()
+
+    def _check_webpage(self, url, stream=True, cancelled=None, pool=None):
+        """check_webpage without the error handling.
+
+        With a ScoringPool the body is read here and decoded, extracted
+        and scored by a worker process.
+        """
+        metrics = self.metrics
+        metrics.increment("checks")
+        if self.verdict_cache.fingerprint != self.keywords_fingerprint():
+            # The weights changed since the verdicts were stored
+            self._keywords_changed()
+        verdict = self.verdict_cache.get(url)
+        if verdict is not None:
+            metrics.increment("verdict_cache_hits")
+            return verdict
+        metrics.increment("verdict_cache_misses")
+
+        if cancelled is not None and cancelled():
+            raise CheckCancelled(url)
+        policy = self.fetch_policy
+        if policy.head_first:
+            reason = self._probe(url)
+            if reason is not None:
+                verdict = self._skipped(reason)
+                self.verdict_cache.put(url, *verdict)
+                return verdict
+
+        # Always streamed at the HTTP level, so the byte budget holds
+        with metrics.timer("fetch"):
+            response = self.fetcher.get(url, stream=True)
+        if response.status_code == 304:
+            response.close()
+            verdict = self.fetcher.previous_verdict(url)
+            if verdict is not None:
+                metrics.increment("not_modified")
+                self.verdict_cache.put(url, *verdict)
+                return verdict
+            with metrics.timer("fetch"):
+                response = self.fetcher.get(url, stream=True, conditional=False)
+        if response.status_code >= 400:
+            # An error page says nothing about the page; fail the check
+            # rather than caching it as safe
+            response.close()
+            response.raise_for_status()
+
+        with response:
+            reason = policy.skip_reason(response.headers)
+            if reason is not None:
+                verdict = self._skipped(reason)
+            elif pool is not None:
+                verdict = self._score_in_pool(pool, response, cancelled)
+            elif stream and self.html_backend != "bs4":
+                verdict = self._score_stream(response, cancelled)
+            else:
+                body, truncated = self._read_body(response)
+                # Check text content
+                with metrics.timer("decode"):
+                    encoding = policy.charset(response.headers, body)
+                    html = incremental_decoder(encoding).decode(body, final=True)
+                with metrics.timer("extract"):
+                    text_content = extract_text(html, self.html_backend)
+                if cancelled is not None and cancelled():
+                    raise CheckCancelled(url)
+                verdict = self.check_content(url, text_content)
+                verdict[1]["fetch"] = self._fetch_report(
+                    "truncated" if truncated else "complete", len(body), encoding
+                )
+
+        if verdict[0]:
+            metrics.increment("checks_blocked")
+        self.fetcher.remember(url, response, verdict)
+        self.verdict_cache.put(url, *verdict)
+
+        # Return both the blocking decision and the scores
+        return verdict
+
+    def _probe(self, url):
+        """HEAD a page; return why fetch_policy skips it, or None"""
+        try:
+            with self.metrics.timer("fetch"):
+                response = self.fetcher.head(url)
+            response.close()
+        except Exception:
+            # Some servers mishandle HEAD; the GET decides instead
+            return None
+        if response.status_code >= 400:
+            return None
+        return self.fetch_policy.skip_reason(response.headers)
+
+    def _skipped(self, reason):
+        """Verdict for a page fetch_policy did not read"""
+        self.metrics.increment("pages_skipped")
+        scores = empty_scores()
+        # Nothing was checked, so the page is not known to be safe
+        scores["safe"] = 0.0
+        scores["fetch"] = self._fetch_report("skipped", 0, None, reason)
+        return False, scores
+
+    def _fetch_report(self, policy, size, encoding, reason=None):
+        """The "fetch" entry of a page's scores: which policy applied.
+
+        policy is "complete" (whole body read), "stopped" (reading ended
+        once the page crossed the blocking threshold), "truncated"
+        (fetch_policy.max_bytes reached) or "skipped" (not read; reason
+        says why).
+        """
+        if policy == "truncated":
+            self.metrics.increment("pages_truncated")
+        return {"policy": policy, "reason": reason, "bytes": size, "encoding": encoding}
+
+    def _read_body(self, response):
+        """Read a body up to fetch_policy.max_bytes; return (bytes, truncated)"""
+        budget = self.fetch_policy.max_bytes
+        chunks = []
+        size = 0
+        with self.metrics.timer("fetch"):
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if size + len(chunk) > budget:
+                    chunks.append(chunk[: budget - size])
+                    return b"".join(chunks), True
+                chunks.append(chunk)
+                size += len(chunk)
+        return b"".join(chunks), False
+
+    def check_webpages(
+        self, urls, max_workers=16, per_host_limit=4, stream=True, processes=None
+    ):
+        """Check many webpages concurrently.
+
+        Yields (url, should_block, scores) tuples in completion order. At
+        most max_workers pages are fetched at once and at most
+        per_host_limit of them from the same host; URLs for a busy host are
+        held back instead of tying up a worker. With ``processes``
+        (default: scoring_processes) the fetching threads hand each body to
+        a pool of that many worker processes for decoding, extraction and
+        scoring, so fetching and scoring overlap across all cores; pages
+        are then read whole instead of streamed. ``urls`` may be any
+        iterable and is consumed lazily. A URL that fails to fetch is
+        yielded with should_block set to None and the error message in
+        scores["error"].
+        """
+        if processes is None:
+            processes = self.scoring_processes
+        pool = self.scoring_pool(processes) if processes else None
+        urls = iter(urls)
+        exhausted = False
+        waiting = deque()  # URLs whose host is at per_host_limit
+        active = {}  # host -> number of in-flight checks
+        futures = {}  # future -> (url, host)
+
+        def failed(error):
+            self.metrics.increment("errors")
+            scores = empty_scores()
+            scores["error"] = str(error)
+            return None, scores
+
+        def submit(url, host):
+            active[host] = active.get(host, 0) + 1
+            future = executor.submit(self._check_webpage, url, stream, None, pool)
+            futures[future] = (url, host)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                for _ in range(len(waiting)):
+                    if len(futures) >= max_workers:
+                        break
+                    url, host = waiting.popleft()
+                    if active.get(host, 0) < per_host_limit:
+                        submit(url, host)
+                    else:
+                        waiting.append((url, host))
+
+                while (
+                    not exhausted
+                    and len(futures) < max_workers
+                    and len(waiting) < max_workers * 4
+                ):
+                    url = next(urls, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    try:
+                        host = urlsplit(url).hostname
+                    except ValueError as e:
+                        # A malformed URL fails on its own, not the whole batch
+                        yield (url, *failed(e))
+                        continue
+                    if active.get(host, 0) < per_host_limit:
+                        submit(url, host)
+                    else:
+                        waiting.append((url, host))
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = futures.pop(future)
+                    active[host] -= 1
+                    try:
+                        should_block, scores = future.result()
+                    except Exception as e:
+                        should_block, scores = failed(e)
+                    yield url, should_block, scores
+
+    def _score_in_pool(self, pool, response, cancelled=None):
+        """Read a response and have a worker process score it.
+
+        The text is only extracted in the worker, so the score cache is
+        keyed on the raw body together with its encoding and the HTML
+        backend, which fix the text the worker scores. Identical bodies in
+        a bulk scan are then scored once.
+        """
+        body, truncated = self._read_body(response)
+        if cancelled is not None and cancelled():
+            raise CheckCancelled(response.url)
+        encoding = self.fetch_policy.charset(response.headers, body)
+        key = self.score_cache.key(
+            body, (self.keywords_version, encoding, self.html_backend)
+        )
+        verdict = self.score_cache.get(key)
+        if verdict is None:
+            result, (decode, extract, match) = pool.submit_body(body, encoding).result()
+            for stage, seconds in (("decode", decode), ("extract", extract), ("match", match)):
+                self.metrics.record(stage, seconds)
+            verdict = expand(result)
+            self.score_cache.put(key, *verdict)
+        should_block, scores = verdict
+        scores["fetch"] = self._fetch_report(
+            "truncated" if truncated else "complete", len(body), encoding
+        )
+        return should_block, scores
+
+    def _score_stream(self, response, cancelled=None):
+        """Extract and score a streamed response chunk by chunk with early exit"""
+        scanner = self.matcher.scanner()
+        running = RunningScores(self.category_weights, self.keyword_weights)
+        extractor = make_extractor(self.html_backend)
+        policy = self.fetch_policy
+        # Stage times are summed locally and recorded once per page
+        clock = time.perf_counter
+        fetch = decode = extract = match = 0.0
+
+        decoder = None
+        encoding = None
+        size = 0
+        truncated = False
+        chunks = response.iter_content(chunk_size=self.chunk_size)
+        try:
+            while not truncated:
+                start = clock()
+                chunk = next(chunks, None)
+                fetch += clock() - start
+                if chunk is None:
+                    break
+                if cancelled is not None and cancelled():
+                    raise CheckCancelled(response.url)
+                if size + len(chunk) > policy.max_bytes:
+                    chunk = chunk[: policy.max_bytes - size]
+                    truncated = True
+                size += len(chunk)
+                start = clock()
+                if decoder is None:
+                    # The first chunk is enough to sniff a <meta> charset
+                    encoding = policy.charset(response.headers, chunk)
+                    decoder = incremental_decoder(encoding)
+                text = decoder.decode(chunk)
+                middle = clock()
+                decode += middle - start
+                extractor.feed(text)
+                text = extractor.pop_text().lower()
+                start = clock()
+                extract += start - middle
+                scanner.feed(text)
+                # Hits only ever add up, so a page over the threshold now
+                # stays over it; stop reading the rest of the body. The
+                # full scores are only built once it looks that way, and
+                # score_matches has the final say.
+                running.update(scanner.counts)
+                if running.over_threshold():
+                    should_block, scores = self.score_matches(scanner.counts)
+                    if should_block:
+                        match += clock() - start
+                        scores["fetch"] = self._fetch_report("stopped", size, encoding)
+                        return should_block, scores
+                match += clock() - start
+
+            start = clock()
+            if decoder is not None:
+                extractor.feed(decoder.decode(b"", final=True))
+            extractor.close()
+            text = extractor.pop_text().lower()
+            extract += clock() - start
+            start = clock()
+            scanner.feed(text)
+            should_block, scores = self.score_matches(scanner.close())
+            match += clock() - start
+            scores["fetch"] = self._fetch_report(
+                "truncated" if truncated else "complete", size, encoding
+            )
+            return should_block, scores
+        finally:
+            for stage, seconds in (
+                ("fetch", fetch),
+                ("decode", decode),
+                ("extract", extract),
+                ("match", match),
+            ):
+                self.metrics.record(stage, seconds)
+
+
+def empty_scores():
+    """Scores reported when nothing could be checked"""
+    return {
+        "explicit": 0.0,
+        "moderate": 0.0,
+        "safe": 1.0,
+        "matches": {"explicit": [], "moderate": []},
+    }
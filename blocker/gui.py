@@ -18,14 +18,29 @@ from PyQt5.QtWidgets import (
     QFileDialog,
     QScrollArea,
     QProgressBar,
+    QListView,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PyQt5.QtCore import (
+    Qt,
+    QObject,
+    QRunnable,
+    QThread,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
 )
-from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
 import json
 import os
 import ctypes
 import sys
-from .filter import ContentFilter
+import threading
+import time
+from .filter import CheckCancelled, ContentFilter
+from .models import FilterListModel
 from .utils import is_valid_url
 
 
@@ -132,6 +147,98 @@ class AppreciationDialog(QDialog):
         self.setLayout(layout)
 
 
+class ImportWorker(QThread):
+    """Imports a blocklist file off the GUI thread"""
+
+    # bytes read, total bytes
+    progress = pyqtSignal("qint64", "qint64")
+    # number of names added to the blocklist
+    imported = pyqtSignal(int)
+
+    def __init__(self, content_filter, path, parent=None):
+        super().__init__(parent)
+        self.content_filter = content_filter
+        self.path = path
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Roll the import back at its next batch"""
+        self._cancelled.set()
+
+    def run(self):
+        added = self.content_filter.import_blocklist(
+            self.path, self.progress.emit, self._cancelled.is_set
+        )
+        if not self._cancelled.is_set():
+            self.imported.emit(added)
+
+
+class CheckSignals(QObject):
+    """Signals of a CheckTask; QRunnable itself cannot emit signals"""
+
+    # url, should_block, scores
+    checked = pyqtSignal(str, bool, object)
+    # url, error message
+    failed = pyqtSignal(str, str)
+    # url
+    cancelled = pyqtSignal(str)
+
+
+class CheckTask(QRunnable):
+    """Checks one webpage on a QThreadPool thread"""
+
+    def __init__(self, content_filter, url):
+        super().__init__()
+        self.content_filter = content_filter
+        self.url = url
+        self.signals = CheckSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop the check at its next chance; it then reports cancelled"""
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            should_block, scores = self.content_filter.check_webpage(
+                self.url, cancelled=self._cancelled.is_set
+            )
+        except CheckCancelled:
+            self.signals.cancelled.emit(self.url)
+        except Exception as e:
+            self.signals.failed.emit(self.url, str(e))
+        else:
+            if self._cancelled.is_set():
+                self.signals.cancelled.emit(self.url)
+            else:
+                self.signals.checked.emit(self.url, should_block, scores)
+
+
+class FilterLoader(QThread):
+    """Builds the ContentFilter (blocklist, keywords, caches) off the GUI thread"""
+
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, profiler=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.content_filter = None
+
+    def run(self):
+        try:
+            if self.profiler is None:
+                content_filter = ContentFilter()
+            else:
+                with self.profiler.profile("load_filter"):
+                    content_filter = ContentFilter()
+                self.profiler.install(content_filter)
+            self.content_filter = content_filter
+            self.loaded.emit(content_filter)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 def is_admin():
     try:
         return ctypes.windll.shell32.IsUserAnAdmin()
@@ -140,12 +247,17 @@ def is_admin():
 
 
 class BlockerWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, show_welcome=True, started=None, profiler=None):
+        """Create the window; the content filter loads in the background.
+
+        ``started`` is the time.perf_counter() value startup timings in
+        ``startup_times`` are measured from (default: now). With a
+        blocker.profiling.Profiler, filter loading and its operations are
+        profiled.
+        """
         super().__init__()
-
-        # Show appreciation dialog
-        dialog = AppreciationDialog(self)
-        dialog.exec_()
+        self.started = time.perf_counter() if started is None else started
+        self.startup_times = {}
 
         self.setWindowTitle("NSFW Blocker")
         # Set window icon - handle both development and PyInstaller environments
@@ -184,23 +296,81 @@ class BlockerWindow(QMainWindow):
                 "Please run the application as administrator.",
             )
 
-        # Initialize content filter
-        self.content_filter = ContentFilter()
-
-        # Initialize blocking state
+        # The content filter is loaded by a FilterLoader once the window is up
+        self.content_filter = None
         self.blocking_enabled = False
 
+        # Webpage checks run on this pool so the window stays responsive
+        self.check_pool = QThreadPool(self)
+        self.check_pool.setMaxThreadCount(4)
+        self.checks = []  # running CheckTasks
+        # Detection label text to restore once cancelled checks have stopped
+        self.cancelled_label = None
+        self.import_worker = None
+
         # Setup UI
         self.setup_ui()
         self.setup_tray()
+        self.mark_startup("window")
+
+        self.loader = FilterLoader(self, profiler)
+        self.loader.loaded.connect(self.filter_loaded)
+        self.loader.failed.connect(self.filter_failed)
+        self.loader.start()
+
+        if show_welcome:
+            # Show the welcome dialog without holding up the window
+            QTimer.singleShot(0, self.show_welcome)
+
+    def mark_startup(self, stage):
+        """Record and log how long startup took to reach a stage"""
+        elapsed = time.perf_counter() - self.started
+        self.startup_times[stage] = elapsed
+        print(f"Startup: {stage} ready after {elapsed * 1000:.0f} ms")
+
+    def show_welcome(self):
+        self.welcome_dialog = AppreciationDialog(self)
+        self.welcome_dialog.setModal(False)
+        self.welcome_dialog.show()
+
+    def filter_loaded(self, content_filter):
+        """Finish setting up once the ContentFilter has been built"""
+        self.content_filter = content_filter
+        # Coalesce rapid add/check/block clicks into one hosts file write
+        self.content_filter.commit_delay = 0.5
+
+        # Initialize blocking state (still on if an earlier run left it on)
+        self.blocking_enabled = self.content_filter.is_active
+        self.update_status()
+        self.toggle_button.setEnabled(True)
+        self.tabs.setEnabled(True)
+
+        # Load current lists
+        self.update_url_list()
+        self.update_keyword_list()
+        self.mark_startup("filter")
+
+    def filter_failed(self, error):
+        self.status_label.setText("Failed to load the blocklist")
+        QMessageBox.critical(self, "Error", f"Failed to load the blocklist: {error}")
+
+    def update_status(self):
+        if self.blocking_enabled:
+            self.status_label.setText("Blocking is currently enabled")
+            self.toggle_button.setText("Disable Blocking")
+        else:
+            self.status_label.setText("Blocking is currently disabled")
+            self.toggle_button.setText("Enable Blocking")
 
     def setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
 
-        # Create tab widget
+        # Create tab widget; disabled until the content filter has loaded
         tabs = QTabWidget()
+        tabs.setEnabled(False)
+        self.tabs = tabs
 
         # URL blocking tab
         url_tab = QWidget()
@@ -209,17 +379,39 @@ class BlockerWindow(QMainWindow):
         url_input_layout = QHBoxLayout()
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("Enter URL to block...")
-        add_url_button = QPushButton("Add URL")
-        add_url_button.clicked.connect(self.add_url)
+        self.add_url_button = QPushButton("Add URL")
+        self.add_url_button.clicked.connect(self.add_url)
         check_url_button = QPushButton("Check URL")
         check_url_button.clicked.connect(self.check_url)
+        self.import_button = QPushButton("Import URLs")
+        self.import_button.clicked.connect(self.import_urls)
         url_input_layout.addWidget(self.url_input)
-        url_input_layout.addWidget(add_url_button)
+        url_input_layout.addWidget(self.add_url_button)
         url_input_layout.addWidget(check_url_button)
+        url_input_layout.addWidget(self.import_button)
         url_layout.addLayout(url_input_layout)
 
-        self.url_list = QTextEdit()
-        self.url_list.setReadOnly(True)
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 1000)
+        self.import_progress.hide()
+        url_layout.addWidget(self.import_progress)
+
+        # Busy indicator for webpage checks
+        check_progress_layout = QHBoxLayout()
+        self.check_progress = QProgressBar()
+        self.check_progress.setRange(0, 0)
+        self.cancel_checks_button = QPushButton("Cancel")
+        self.cancel_checks_button.clicked.connect(self.cancel_checks)
+        check_progress_layout.addWidget(self.check_progress)
+        check_progress_layout.addWidget(self.cancel_checks_button)
+        self.check_progress_widget = QWidget()
+        self.check_progress_widget.setLayout(check_progress_layout)
+        self.check_progress_widget.hide()
+        url_layout.addWidget(self.check_progress_widget)
+
+        self.url_model = FilterListModel(parent=self)
+        url_layout.addLayout(self.make_filter_bar(self.url_model, "Filter URLs..."))
+        self.url_list = self.make_list_view(self.url_model)
         url_layout.addWidget(self.url_list)
 
         # Keyword blocking tab
@@ -233,23 +425,57 @@ class BlockerWindow(QMainWindow):
         category_label = QLabel("Category:")
         self.keyword_category = QComboBox()
         self.keyword_category.addItems(["explicit", "moderate"])
+        self.keyword_category.currentTextChanged.connect(self.update_keyword_list)
         category_layout.addWidget(category_label)
         category_layout.addWidget(self.keyword_category)
 
         add_keyword_button = QPushButton("Add Keyword")
         add_keyword_button.clicked.connect(self.add_keyword)
 
-        self.keyword_list = QTextEdit()
-        self.keyword_list.setReadOnly(True)
+        # Keywords of the selected category
+        self.keyword_model = FilterListModel(parent=self)
+        self.keyword_list = self.make_list_view(self.keyword_model)
         keyword_layout.addWidget(keyword_label)
         keyword_layout.addWidget(self.keyword_input)
         keyword_layout.addLayout(category_layout)
         keyword_layout.addWidget(add_keyword_button)
+        keyword_layout.addLayout(
+            self.make_filter_bar(self.keyword_model, "Filter keywords...")
+        )
         keyword_layout.addWidget(self.keyword_list)
 
+        # Diagnostics tab: stage timings and counters from ContentFilter.stats()
+        diagnostics_tab = QWidget()
+        diagnostics_layout = QVBoxLayout(diagnostics_tab)
+        self.timers_table = QTableWidget(0, 5)
+        self.timers_table.setHorizontalHeaderLabels(
+            ["Stage", "Calls", "Total (ms)", "Mean (ms)", "Max (ms)"]
+        )
+        self.counters_table = QTableWidget(0, 2)
+        self.counters_table.setHorizontalHeaderLabels(["Counter", "Value"])
+        for table in (self.timers_table, self.counters_table):
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            table.verticalHeader().hide()
+            table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        reset_stats_button = QPushButton("Reset Statistics")
+        reset_stats_button.clicked.connect(self.reset_diagnostics)
+        diagnostics_layout.addWidget(QLabel("Stage timings:"))
+        diagnostics_layout.addWidget(self.timers_table)
+        diagnostics_layout.addWidget(QLabel("Counters:"))
+        diagnostics_layout.addWidget(self.counters_table)
+        diagnostics_layout.addWidget(reset_stats_button)
+
         # Add tabs
         tabs.addTab(url_tab, "URL Blocking")
         tabs.addTab(keyword_tab, "Keyword Blocking")
+        tabs.addTab(diagnostics_tab, "Diagnostics")
+        self.diagnostics_tab = diagnostics_tab
+
+        # Refresh the diagnostics while they are on screen
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(1000)
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+        tabs.currentChanged.connect(self.diagnostics_tab_changed)
 
         # Add tabs to main layout
         layout.addWidget(tabs)
@@ -353,8 +579,9 @@ class BlockerWindow(QMainWindow):
 
         # Status and control
         status_layout = QHBoxLayout()
-        self.status_label = QLabel("Blocking is currently disabled")
+        self.status_label = QLabel("Loading blocklist...")
         self.toggle_button = QPushButton("Enable Blocking")
+        self.toggle_button.setEnabled(False)
         self.toggle_button.clicked.connect(self.toggle_blocking)
 
         status_layout.addWidget(self.status_label)
@@ -382,9 +609,38 @@ class BlockerWindow(QMainWindow):
         button_layout.addWidget(close_button)
         layout.addLayout(button_layout)
 
-        # Load current lists
-        self.update_url_list()
-        self.update_keyword_list()
+    def make_list_view(self, model):
+        """Read-only list view that only lays out the rows on screen"""
+        view = QListView()
+        view.setModel(model)
+        view.setUniformItemSizes(True)
+        view.setEditTriggers(QListView.NoEditTriggers)
+        return view
+
+    def make_filter_bar(self, model, placeholder):
+        """Filter box and match mode for a FilterListModel"""
+        layout = QHBoxLayout()
+        text = QLineEdit()
+        text.setPlaceholderText(placeholder)
+        text.setClearButtonEnabled(True)
+        mode = QComboBox()
+        mode.addItems(["Contains", "Starts with"])
+
+        # Filter once typing pauses rather than on every keystroke
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(150)
+        timer.timeout.connect(
+            lambda: model.set_filter(
+                text.text().strip(), prefix=mode.currentIndex() == 1
+            )
+        )
+        text.textChanged.connect(timer.start)
+        mode.currentIndexChanged.connect(timer.start)
+
+        layout.addWidget(text)
+        layout.addWidget(mode)
+        return layout
 
     def setup_tray(self):
         self.tray_icon = QSystemTrayIcon(self)
@@ -417,7 +673,7 @@ class BlockerWindow(QMainWindow):
             return
 
         try:
-            if self.content_filter.flush_dns_cache():
+            if self.content_filter.flush_dns_cache(wait=True):
                 QMessageBox.information(
                     self, "Success", "DNS cache flushed successfully"
                 )
@@ -437,9 +693,21 @@ class BlockerWindow(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            # Ensure blocking is disabled when quitting
-            if self.blocking_enabled:
-                self.content_filter.disable_blocking()
+            # Give running checks a moment to stop before closing the filter
+            self.cancel_checks()
+            self.check_pool.waitForDone(2000)
+            # An import must be rolled back before the filter is closed
+            if self.import_worker is not None:
+                self.import_worker.cancel()
+                self.import_worker.wait()
+            # The filter may have finished loading without being picked up yet
+            self.loader.wait()
+            content_filter = self.content_filter or self.loader.content_filter
+            if content_filter is not None:
+                # Ensure blocking is disabled when quitting
+                if self.blocking_enabled:
+                    content_filter.disable_blocking()
+                content_filter.close()
             QApplication.quit()
 
     def add_url(self):
@@ -455,7 +723,7 @@ class BlockerWindow(QMainWindow):
         if url:
             if is_valid_url(url):
                 if self.content_filter.block_url(url):
-                    self.update_url_list()
+                    self.update_url_rows(url)
                     self.url_input.clear()
                     # Check the URL after adding
                     self.check_url()
@@ -464,6 +732,55 @@ class BlockerWindow(QMainWindow):
             else:
                 QMessageBox.warning(self, "Error", "Invalid URL format")
 
+    def import_urls(self):
+        """Block every domain in a text, hosts-format or adblock list file"""
+        if not is_admin():
+            QMessageBox.warning(
+                self,
+                "Admin Rights Required",
+                "Administrator privileges are required to modify the hosts file.",
+            )
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import URLs", "", "Text files (*.txt);;All files (*)"
+        )
+        if not path:
+            return
+
+        self.set_importing(True)
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+
+        self.import_worker = ImportWorker(self.content_filter, path, self)
+        self.import_worker.progress.connect(self.update_import_progress)
+        self.import_worker.imported.connect(self.import_finished)
+        self.import_worker.start()
+
+    def update_import_progress(self, done, total):
+        if total:
+            self.import_progress.setValue(int(done * 1000 / total))
+
+    def set_importing(self, importing):
+        """Lock the blocklist controls while an import runs.
+
+        The import holds the blocklist until it finishes, so blocking a URL
+        or toggling blocking meanwhile would freeze the window.
+        """
+        for control in (self.import_button, self.add_url_button, self.toggle_button):
+            control.setEnabled(not importing)
+
+    def import_running(self):
+        return self.import_worker is not None and self.import_worker.isRunning()
+
+    def import_finished(self, added):
+        self.import_progress.hide()
+        self.set_importing(False)
+        self.update_url_list()
+        QMessageBox.information(
+            self, "Import Complete", f"Added {added} entries to the blocklist"
+        )
+
     def check_url(self):
         """Check the current URL for NSFW content"""
         url = self.url_input.text().strip()
@@ -475,44 +792,58 @@ class BlockerWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Invalid URL format")
             return
 
-        try:
-            is_blocked = self.check_webpage(url)
-            if is_blocked:
-                reply = QMessageBox.question(
-                    self,
-                    "Block URL?",
-                    "NSFW content detected. Would you like to block this URL?",
-                    QMessageBox.Yes | QMessageBox.No,
-                    QMessageBox.Yes,
-                )
-                if reply == QMessageBox.Yes:
-                    self.content_filter.block_url(url)
-                    self.update_url_list()
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to check URL: {str(e)}")
+        self.check_webpage(url)
+
+    def check_finished(self, url, should_block, scores):
+        """Show the result of a background check and offer to block"""
+        self.update_feedback_display(scores)
+        if should_block:
+            reply = QMessageBox.question(
+                self,
+                "Block URL?",
+                f"NSFW content detected on {url}. Would you like to block this URL?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes,
+            )
+            if reply == QMessageBox.Yes:
+                if self.import_running():
+                    QMessageBox.warning(
+                        self, "Error", "Wait for the import to finish before blocking URLs"
+                    )
+                    return
+                self.content_filter.block_url(url)
+                self.update_url_rows(url)
+
+    def check_failed(self, url, error):
+        QMessageBox.warning(self, "Error", f"Failed to check {url}: {error}")
 
     def add_keyword(self):
         keyword = self.keyword_input.text().strip()
         category = self.keyword_category.currentText()
         if keyword:
             if self.content_filter.add_keyword(keyword, category):
-                self.update_keyword_list()
+                self.keyword_model.sync(
+                    [keyword],
+                    lambda word: self.content_filter.keywords.contains(word, category),
+                )
                 self.keyword_input.clear()
             else:
                 QMessageBox.warning(self, "Error", "Keyword already exists")
 
     def update_url_list(self):
-        urls = self.content_filter.get_blocked_urls()
-        self.url_list.setText("\n".join(urls))
+        """Reload the whole URL list, e.g. after an import"""
+        self.url_model.set_items(self.content_filter.get_blocked_urls())
+
+    def update_url_rows(self, url):
+        """Insert or remove just the rows for the names of one URL"""
+        self.url_model.sync(
+            self.content_filter.url_names(url),
+            self.content_filter.blocklist.__contains__,
+        )
 
     def update_keyword_list(self):
-        keywords = self.content_filter.get_keywords()
-        text = []
-        for category, words in keywords.items():
-            if words:
-                text.append(f"{category.upper()}:")
-                text.extend(f"  - {word}" for word in words)
-        self.keyword_list.setText("\n".join(text))
+        category = self.keyword_category.currentText()
+        self.keyword_model.set_items(self.content_filter.get_keywords(category))
 
     def apply_settings(self):
         pass  # Remove settings functionality since it was only for NSFW detection
@@ -561,9 +892,21 @@ class BlockerWindow(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
-            # Ensure blocking is disabled when quitting
-            if self.blocking_enabled:
-                self.content_filter.disable_blocking()
+            # Give running checks a moment to stop before closing the filter
+            self.cancel_checks()
+            self.check_pool.waitForDone(2000)
+            # An import must be rolled back before the filter is closed
+            if self.import_worker is not None:
+                self.import_worker.cancel()
+                self.import_worker.wait()
+            # The filter may have finished loading without being picked up yet
+            self.loader.wait()
+            content_filter = self.content_filter or self.loader.content_filter
+            if content_filter is not None:
+                # Ensure blocking is disabled when quitting
+                if self.blocking_enabled:
+                    content_filter.disable_blocking()
+                content_filter.close()
             QApplication.quit()
 
     def changeEvent(self, event):
@@ -579,14 +922,88 @@ class BlockerWindow(QMainWindow):
         self.hide()
 
     def check_webpage(self, url):
-        """Check webpage and update feedback display"""
-        try:
-            is_blocked, scores = self.content_filter.check_webpage(url)
-            self.update_feedback_display(scores)
-            return is_blocked
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to check webpage: {str(e)}")
-            return False
+        """Start checking a webpage in the background.
+
+        Several checks may run at once; each one updates the feedback
+        display when it finishes.
+        """
+        task = CheckTask(self.content_filter, url)
+        task.signals.checked.connect(self.check_finished)
+        task.signals.failed.connect(self.check_failed)
+        for signal in (task.signals.checked, task.signals.failed, task.signals.cancelled):
+            signal.connect(lambda *args, task=task: self.check_done(task))
+        self.checks.append(task)
+        self.update_check_progress()
+        self.check_pool.start(task)
+        return task
+
+    def check_done(self, task):
+        if task in self.checks:
+            self.checks.remove(task)
+        self.update_check_progress()
+        if not self.checks and self.cancelled_label is not None:
+            # Show what was there before, unless a result has replaced it
+            if self.detection_label.text() == "Cancelling...":
+                self.detection_label.setText(self.cancelled_label)
+            self.cancelled_label = None
+
+    def cancel_checks(self):
+        """Cancel every running webpage check"""
+        for task in self.checks:
+            task.cancel()
+        if self.checks:
+            if self.cancelled_label is None:
+                self.cancelled_label = self.detection_label.text()
+            self.detection_label.setText("Cancelling...")
+
+    def update_check_progress(self):
+        """Show the busy indicator while checks are running"""
+        if self.checks:
+            urls = ", ".join(task.url for task in self.checks[:3])
+            if len(self.checks) > 3:
+                urls += f" and {len(self.checks) - 3} more"
+            self.check_progress.setFormat(f"Checking {urls}...")
+            self.check_progress.setTextVisible(True)
+            self.check_progress_widget.show()
+        else:
+            self.check_progress_widget.hide()
+
+    def diagnostics_tab_changed(self, index):
+        if self.tabs.widget(index) is self.diagnostics_tab:
+            self.update_diagnostics()
+            self.diagnostics_timer.start()
+        else:
+            self.diagnostics_timer.stop()
+
+    def update_diagnostics(self):
+        """Fill the diagnostics tables from ContentFilter.stats()"""
+        if self.content_filter is None or not self.isVisible():
+            return
+        stats = self.content_filter.stats()
+
+        timers = sorted(stats["timers"].items())
+        self.timers_table.setRowCount(len(timers))
+        for row, (stage, timer) in enumerate(timers):
+            values = [
+                stage,
+                str(timer["count"]),
+                f"{timer['total'] * 1000:.1f}",
+                f"{timer['mean'] * 1000:.2f}",
+                f"{timer['max'] * 1000:.2f}",
+            ]
+            for column, value in enumerate(values):
+                self.timers_table.setItem(row, column, QTableWidgetItem(value))
+
+        counters = sorted({**stats["counters"], **stats["gauges"]}.items())
+        self.counters_table.setRowCount(len(counters))
+        for row, (name, value) in enumerate(counters):
+            self.counters_table.setItem(row, 0, QTableWidgetItem(name))
+            self.counters_table.setItem(row, 1, QTableWidgetItem(str(value)))
+
+    def reset_diagnostics(self):
+        if self.content_filter is not None:
+            self.content_filter.metrics.reset()
+            self.update_diagnostics()
 
     def update_feedback_display(self, scores):
         """Update the feedback display with detection results"""
@@ -609,13 +1026,22 @@ class BlockerWindow(QMainWindow):
             for keyword, count in scores["matches"]["moderate"]:
                 matches_text.append(f"  • {keyword} ({count} occurrences)")
 
-        if not matches_text:
+        fetch = scores.get("fetch") or {}
+        if fetch.get("policy") == "skipped":
+            matches_text = [f"Page not checked: {fetch['reason']}"]
+        elif not matches_text:
             matches_text = ["No inappropriate content detected"]
+        if fetch.get("policy") == "truncated":
+            matches_text.append("")
+            matches_text.append(f"Only the first {fetch['bytes'] // 1024} KB were checked")
 
         self.matches_text.setText("\n".join(matches_text))
 
         # Update detection label based on scores
-        if scores["explicit"] >= 0.3:
+        if fetch.get("policy") == "skipped":
+            status = "Not Checked"
+            color = "#6c757d"  # Grey
+        elif scores["explicit"] >= 0.3:
             status = "Explicit Content Detected"
             color = "#dc3545"  # Red
         elif scores["moderate"] >= 0.45:
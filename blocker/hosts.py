@@ -0,0 +1,125 @@
+import os
+
+
+BEGIN_MARKER = "# >>> NSFW Blocker >>>"
+END_MARKER = "# <<< NSFW Blocker <<<"
+
+_BEGIN_LINE = (BEGIN_MARKER + "\n").encode("utf-8")
+_END_LINE = (END_MARKER + "\n").encode("utf-8")
+
+
+class HostsSection:
+    """The delimited section of the hosts file that the blocker owns.
+
+    Everything outside the BEGIN_MARKER/END_MARKER lines is left alone.
+    The byte span of the section is remembered between calls, so appends
+    and rewrites seek straight to it unless the file changed behind our
+    back.
+    """
+
+    def __init__(self, path, address="127.0.0.1"):
+        self.path = path
+        self.address = address
+        # (start, end marker start, end, (size, mtime)) of the section as
+        # of our last look
+        self._span = None
+
+    def _lines(self, names):
+        for name in names:
+            yield f"{self.address} {name}\n".encode("utf-8")
+
+    def _signature(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _remember(self, start, marker, end):
+        self._span = (start, marker, end, self._signature())
+
+    def _locate(self):
+        """Return the section's (start, end marker, end) byte offsets, or None.
+
+        The end marker line may end in CRLF or in nothing at all, so where
+        it starts is recorded rather than derived from its length.
+        """
+        signature = self._signature()
+        if self._span is not None and self._span[3] == signature:
+            return self._span[:3]
+
+        self._span = None
+        start = None
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                stripped = line.strip()
+                if start is None and stripped == _BEGIN_LINE.strip():
+                    start = offset
+                elif start is not None and stripped == _END_LINE.strip():
+                    self._span = (start, offset, offset + len(line), signature)
+                    return self._span[:3]
+                offset += len(line)
+        return None
+
+    def is_installed(self):
+        """Check whether the section is present in the hosts file"""
+        return self._locate() is not None
+
+    def write(self, names):
+        """Replace the section with entries for names, adding it if missing"""
+        span = self._locate()
+        with open(self.path, "r+b") as f:
+            if span is None:
+                f.seek(0, os.SEEK_END)
+                start = f.tell()
+                tail = b""
+                if start:
+                    f.seek(start - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                        start += 1
+            else:
+                start, _, end = span
+                f.seek(end)
+                tail = f.read()
+                f.seek(start)
+
+            f.write(_BEGIN_LINE)
+            f.writelines(self._lines(names))
+            marker = f.tell()
+            f.write(_END_LINE)
+            end = f.tell()
+            f.write(tail)
+            f.truncate()
+        self._remember(start, marker, end)
+
+    def append(self, names):
+        """Add entries to the end of the section without rewriting it"""
+        span = self._locate()
+        if span is None:
+            self.write(names)
+            return
+        start, marker, end = span
+        with open(self.path, "r+b") as f:
+            f.seek(end)
+            tail = f.read()
+            f.seek(marker)
+            f.writelines(self._lines(names))
+            marker = f.tell()
+            f.write(_END_LINE)
+            end = f.tell()
+            f.write(tail)
+            f.truncate()
+        self._remember(start, marker, end)
+
+    def remove(self):
+        """Take the section out of the hosts file"""
+        span = self._locate()
+        if span is None:
+            return
+        start, _, end = span
+        with open(self.path, "r+b") as f:
+            f.seek(end)
+            tail = f.read()
+            f.seek(start)
+            f.write(tail)
+            f.truncate()
+        self._span = None
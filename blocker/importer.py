@@ -0,0 +1,114 @@
+import os
+import re
+
+
+# Hosts-file names that describe the machine itself, not something to block
+_LOCAL_NAMES = frozenset(
+    {
+        "localhost",
+        "localhost.localdomain",
+        "local",
+        "broadcasthost",
+        "ip6-localhost",
+        "ip6-loopback",
+        "ip6-localnet",
+        "ip6-mcastprefix",
+        "ip6-allnodes",
+        "ip6-allrouters",
+        "ip6-allhosts",
+        "0.0.0.0",
+    }
+)
+
+_HOST = re.compile(r"[a-z0-9_-]+(?:\.[a-z0-9_-]+)+")
+# The common shapes of all three list formats: "a.com", "||a.com^" and
+# "0.0.0.0 a.com"; anything else goes through the general parser
+_SIMPLE_LINE = re.compile(
+    r"(?:\|\||(?:0\.0\.0\.0|127\.0\.0\.1)[ \t]+)?"
+    r"([a-z0-9_-]+(?:\.[a-z0-9_-]+)+)\^?"
+)
+_ALLOWED = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-._")
+
+
+def normalize_domain(name):
+    """Reduce a URL or host name to a lowercase host, or None if it is not one"""
+    name = name.strip().lower()
+    if _HOST.fullmatch(name):
+        # Common case: already a bare host name
+        return None if name in _LOCAL_NAMES else name
+    if "://" in name:
+        name = name.split("://", 1)[1]
+    name = name.split("/", 1)[0].split(":", 1)[0].strip(".")
+    if not name or name in _LOCAL_NAMES or "." not in name:
+        return None
+    if not _ALLOWED.issuperset(name):
+        try:
+            name = name.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    return name
+
+
+def parse_line(line):
+    """Return the host names listed on one line of a blocklist.
+
+    Understands plain domain/URL lists, hosts-format lines
+    ("0.0.0.0 a.com b.com") and adblock-style rules ("||a.com^").
+    """
+    line = line.strip()
+    if not line or line[0] in "#![":
+        return []
+
+    simple = _SIMPLE_LINE.fullmatch(line.lower())
+    if simple:
+        name = simple.group(1)
+        return [] if name in _LOCAL_NAMES else [name]
+
+    if line.startswith("||"):
+        # Adblock rule: ||domain^ with optional $options; skip path rules
+        rule = line[2:].split("$", 1)[0]
+        end = len(rule)
+        for marker in "^/*":
+            index = rule.find(marker)
+            if index != -1:
+                end = min(end, index)
+        if rule[end:end + 1] in ("/", "*"):
+            return []
+        name = normalize_domain(rule[:end])
+        return [name] if name else []
+    if line.startswith("@@"):
+        # Adblock exception rules never block anything
+        return []
+
+    fields = line.split("#", 1)[0].split()
+    if len(fields) > 1:
+        # Hosts format: address followed by one or more names
+        names = (normalize_domain(field) for field in fields[1:])
+        return [name for name in names if name]
+    if fields:
+        name = normalize_domain(fields[0])
+        return [name] if name else []
+    return []
+
+
+def iter_domains(path, progress=None, progress_every=50000):
+    """Yield unique host names from a blocklist file, reading it line by line.
+
+    ``progress(bytes_read, total_bytes)`` is called every progress_every
+    lines and once at the end; bytes_read counts characters, which is
+    exact for ASCII lists and close enough otherwise.
+    """
+    total = os.path.getsize(path)
+    seen = set()
+    read = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for count, line in enumerate(f, 1):
+            read += len(line)
+            for name in parse_line(line):
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+            if progress is not None and count % progress_every == 0:
+                progress(min(read, total), total)
+    if progress is not None:
+        progress(total, total)
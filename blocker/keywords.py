@@ -0,0 +1,131 @@
+import hashlib
+import threading
+from collections.abc import Mapping
+
+from .utils import load_json_file, save_json_file
+
+
+DEFAULT_CATEGORIES = ("explicit", "moderate")
+
+
+def _keyword_hash(category, keyword):
+    data = f"{category}\0{keyword}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest(), "little")
+
+
+class KeywordStore(Mapping):
+    """Keyword lists by category, persisted to a JSON file.
+
+    Each category is an insertion-ordered set, so membership checks, adds
+    and removals are O(1) and the file keeps the order keywords were added
+    in. Indexing a category returns a live, read-only view of it.
+
+    Changes are written after ``save_delay`` seconds without further
+    changes (immediately with 0), as compact JSON through a temporary file
+    that replaces the old one, so a crash never leaves a partial file.
+    ``version`` goes up with every change that actually altered a list;
+    anything derived from the keywords can compare it to rebuild lazily.
+    ``fingerprint()`` identifies the contents across runs; it is a sum of
+    per-keyword hashes, kept up to date in O(1) per change.
+    """
+
+    def __init__(self, path, save_delay=1.0, categories=DEFAULT_CATEGORIES):
+        self.path = path
+        self.save_delay = save_delay
+        self.version = 0
+
+        data = load_json_file(path, default={})
+        self._categories = {category: {} for category in categories}
+        for category, words in data.items():
+            self._categories[category] = dict.fromkeys(words)
+        self._digest = sum(
+            _keyword_hash(category, keyword)
+            for category, words in self._categories.items()
+            for keyword in words
+        )
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._save_timer = None
+
+    def __getitem__(self, category):
+        return self._categories[category].keys()
+
+    def __iter__(self):
+        return iter(self._categories)
+
+    def __len__(self):
+        return len(self._categories)
+
+    def contains(self, keyword, category):
+        """Check whether a keyword is listed in a category"""
+        return keyword in self._categories.get(category, ())
+
+    def fingerprint(self):
+        """Hex digest of the keyword lists, independent of their order"""
+        return f"{self._digest % (1 << 128):032x}"
+
+    def as_dict(self):
+        """Plain {category: [keywords]} copy of the lists"""
+        with self._lock:
+            return {
+                category: list(words) for category, words in self._categories.items()
+            }
+
+    def add(self, keywords, category="explicit"):
+        """Add keywords to a category; return how many were new"""
+        with self._lock:
+            words = self._categories.setdefault(category, {})
+            before = len(words)
+            for keyword in keywords:
+                if keyword not in words:
+                    words[keyword] = None
+                    self._digest += _keyword_hash(category, keyword)
+            added = len(words) - before
+            if added:
+                self._changed()
+        return added
+
+    def discard(self, keywords, category="explicit"):
+        """Remove keywords from a category; return how many were listed"""
+        with self._lock:
+            words = self._categories.get(category)
+            if not words:
+                return 0
+            before = len(words)
+            for keyword in keywords:
+                if keyword in words:
+                    del words[keyword]
+                    self._digest -= _keyword_hash(category, keyword)
+            removed = before - len(words)
+            if removed:
+                self._changed()
+        return removed
+
+    def _changed(self):
+        """Bump the version and schedule a save; called with the lock held"""
+        self.version += 1
+        self._dirty = True
+        if not self.save_delay:
+            self._save()
+            return
+        # Restart the timer so a burst of changes is written once
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(self.save_delay, self.save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _save(self):
+        data = {category: list(words) for category, words in self._categories.items()}
+        save_json_file(self.path, data, compact=True)
+        self._dirty = False
+
+    def save(self):
+        """Write pending changes right away"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._dirty:
+                self._save()
@@ -0,0 +1,139 @@
+import re
+
+
+_BOUNDARY = re.compile(r"\b")
+
+
+def _is_boundary(text, index):
+    """Return True if a regex word boundary sits at text[index]"""
+    return _BOUNDARY.match(text, index) is not None
+
+
+def _trie_pattern(node):
+    """Render a character trie as a regex, longest alternatives first"""
+    branches = []
+    for char in sorted(node, key=lambda c: (c == "", c)):
+        if char == "":
+            # Terminal: a keyword ends here and must end on a word boundary
+            branches.append(r"\b")
+        else:
+            branches.append(re.escape(char) + _trie_pattern(node[char]))
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class KeywordMatcher:
+    """Find word-bounded hits for every keyword category in a single scan.
+
+    The keyword lists are folded into one trie-shaped regex wrapped in a
+    lookahead, so each text position is tried once against all keywords.
+    Hits are counted exactly like a separate ``re.findall(r"\\bkw\\b")`` per
+    keyword would count them, including shorter keywords that start at the
+    same position as a longer one.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = {
+            category: list(words) for category, words in keywords.items()
+        }
+
+        # Lowercased keyword -> [(category, original keyword), ...]
+        self.owners = {}
+        for category, words in self.keywords.items():
+            for keyword in words:
+                lowered = keyword.lower()
+                if not lowered:
+                    continue
+                owners = self.owners.setdefault(lowered, [])
+                if (category, keyword) not in owners:
+                    owners.append((category, keyword))
+
+        # Lowercased keyword -> keywords that also match when it matches
+        # (itself plus every keyword that is a word-bounded prefix of it)
+        self.prefixes = {}
+        for lowered in self.owners:
+            self.prefixes[lowered] = [
+                lowered[:end]
+                for end in range(1, len(lowered))
+                if lowered[:end] in self.owners and _is_boundary(lowered, end)
+            ] + [lowered]
+
+        self.max_length = max((len(k) for k in self.owners), default=0)
+
+        if self.owners:
+            trie = {}
+            for lowered in self.owners:
+                node = trie
+                for char in lowered:
+                    node = node.setdefault(char, {})
+                node[""] = {}
+            self.pattern = re.compile(r"(?=(\b" + _trie_pattern(trie) + "))")
+        else:
+            self.pattern = None
+
+    def scanner(self):
+        """Return a scanner that counts hits over incrementally fed text"""
+        return KeywordScanner(self)
+
+    def count(self, content):
+        """Count hits in an already lowercased string"""
+        scanner = self.scanner()
+        scanner.scan(content, 0, len(content))
+        return scanner.counts
+
+
+class KeywordScanner:
+    """Hit counter for one document, fed in one piece or in chunks"""
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        # (category, keyword) -> number of hits
+        self.counts = {}
+        # Lowercased keyword -> absolute end of its last counted hit
+        self._last_end = {}
+        self._buffer = ""
+        self._offset = 0
+
+    def scan(self, text, start, stop, offset=0):
+        """Count hits that start in text[start:stop]"""
+        pattern = self.matcher.pattern
+        if pattern is None:
+            return
+        prefixes = self.matcher.prefixes
+        owners = self.matcher.owners
+        counts = self.counts
+        last_end = self._last_end
+        for match in pattern.finditer(text, start):
+            position = match.start()
+            if position >= stop:
+                break
+            absolute = offset + position
+            for lowered in prefixes[match.group(1)]:
+                # re.findall never returns overlapping hits of one keyword
+                if last_end.get(lowered, -1) > absolute:
+                    continue
+                last_end[lowered] = absolute + len(lowered)
+                for owner in owners[lowered]:
+                    counts[owner] = counts.get(owner, 0) + 1
+
+    def feed(self, text):
+        """Scan a further chunk of lowercased text"""
+        buffer = self._buffer + text
+        # Hits starting in the tail may continue into the next chunk, so
+        # keep max_length characters back, plus one on each side for the
+        # \b checks around a hit.
+        stop = len(buffer) - self.matcher.max_length - 1
+        if stop > 1:
+            self.scan(buffer, 1 if self._offset else 0, stop, self._offset)
+            self._offset += stop - 1
+            self._buffer = buffer[stop - 1:]
+        else:
+            self._buffer = buffer
+
+    def close(self):
+        """Scan whatever is left in the buffer"""
+        buffer = self._buffer
+        self.scan(buffer, 1 if self._offset else 0, len(buffer), self._offset)
+        self._buffer = ""
+        return self.counts
@@ -0,0 +1,96 @@
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class FilterListModel(QAbstractListModel):
+    """List model over a large collection of strings with a text filter.
+
+    Views only ask for the rows they show, so a QListView over hundreds of
+    thousands of names stays cheap. ``sync`` applies individual additions
+    and removals as row inserts and removes instead of a reset, and the
+    filter is applied by the model itself (one pass over plain strings)
+    rather than by a proxy calling back into ``data`` for every row.
+    """
+
+    def __init__(self, items=(), parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._present = set()
+        self._visible = []
+        self._filter = ""
+        self._prefix = False
+        self.set_items(items)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self._visible[index.row()]
+        return None
+
+    def total(self):
+        """Number of items, including ones hidden by the filter"""
+        return len(self._items)
+
+    def _matches(self, item):
+        # The filter text is lowercased already; compare without case
+        if self._prefix:
+            return item.lower().startswith(self._filter)
+        return self._filter in item.lower()
+
+    def _filtered(self):
+        text = self._filter
+        if not text:
+            return list(self._items)
+        if self._prefix:
+            return [item for item in self._items if item.lower().startswith(text)]
+        return [item for item in self._items if text in item.lower()]
+
+    def set_items(self, items):
+        """Replace every item"""
+        self.beginResetModel()
+        self._items = list(items)
+        self._present = set(self._items)
+        self._visible = self._filtered()
+        self.endResetModel()
+
+    def set_filter(self, text, prefix=False):
+        """Show only items containing (or, with prefix=True, starting with) text.
+
+        Matching ignores case on both sides.
+        """
+        text = text.lower()
+        if (text, prefix) == (self._filter, self._prefix):
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._prefix = prefix
+        self._visible = self._filtered()
+        self.endResetModel()
+
+    def sync(self, items, contains):
+        """Bring the given items in line with ``contains(item)``.
+
+        Items that are now contained and not yet listed are appended;
+        listed ones that no longer are get removed.
+        """
+        for item in items:
+            listed = item in self._present
+            if contains(item):
+                if listed:
+                    continue
+                self._items.append(item)
+                self._present.add(item)
+                if self._matches(item):
+                    row = len(self._visible)
+                    self.beginInsertRows(QModelIndex(), row, row)
+                    self._visible.append(item)
+                    self.endInsertRows()
+            elif listed:
+                self._items.remove(item)
+                self._present.discard(item)
+                if self._matches(item):
+                    row = self._visible.index(item)
+                    self.beginRemoveRows(QModelIndex(), row, row)
+                    del self._visible[row]
+                    self.endRemoveRows()
@@ -0,0 +1,113 @@
+import cProfile
+import functools
+import itertools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+# Directory to write profiles to; setting it turns profiling on
+PROFILE_ENV = "NSFW_BLOCKER_PROFILE"
+
+# ContentFilter methods wrapped by Profiler.install
+PROFILED_METHODS = (
+    "check_webpage",
+    "check_content",
+    "block_url",
+    "unblock_url",
+    "block_urls",
+    "unblock_urls",
+    "import_blocklist",
+    "check_contents",
+    "enable_blocking",
+    "disable_blocking",
+)
+
+
+class Profiler:
+    """Opt-in cProfile + tracemalloc profiling of whole operations.
+
+    Every profiled call writes ``<operation>-<n>.prof`` to ``directory``
+    (open it with pstats or snakeviz) and appends its duration and peak
+    traced memory to ``memory.tsv`` there. Only the outermost profiled
+    call on a thread is recorded, so check_content inside check_webpage
+    shows up in the check_webpage profile, and block_urls writes one
+    profile rather than one per URL. Peak memory comes from tracemalloc,
+    which is process wide, so it is approximate when several operations
+    overlap; before Python 3.9 it cannot be reset and is the peak so far.
+
+    Nothing is wrapped unless ``install`` is called, so code paths pay
+    nothing when profiling is off.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.summary_path = os.path.join(directory, "memory.tsv")
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if not os.path.exists(self.summary_path):
+            with open(self.summary_path, "w", encoding="utf-8") as f:
+                f.write("operation\tseconds\tpeak_kib\tprofile\n")
+
+    @contextmanager
+    def profile(self, operation):
+        """Profile the body of a with block as one operation"""
+        if getattr(self._local, "active", False):
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler owns this thread (or the whole process)
+            yield
+            return
+        self._local.active = True
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            self._local.active = False
+            self._write(operation, profile, elapsed, peak)
+
+    def _write(self, operation, profile, elapsed, peak):
+        with self._lock:
+            name = f"{operation}-{next(self._counter):04d}.prof"
+            profile.dump_stats(os.path.join(self.directory, name))
+            with open(self.summary_path, "a", encoding="utf-8") as f:
+                f.write(f"{operation}\t{elapsed:.6f}\t{peak / 1024:.1f}\t{name}\n")
+
+    def wrap(self, func, operation=None):
+        """Return func profiled as ``operation`` (default: its name)"""
+        operation = operation or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.profile(operation):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def install(self, content_filter, methods=PROFILED_METHODS):
+        """Profile a ContentFilter's operations from now on"""
+        for name in methods:
+            setattr(content_filter, name, self.wrap(getattr(content_filter, name), name))
+        return content_filter
+
+
+def profiler_from_env(directory=None):
+    """A Profiler for ``directory`` or $NSFW_BLOCKER_PROFILE, or None if neither"""
+    directory = directory or os.environ.get(PROFILE_ENV)
+    return Profiler(directory) if directory else None
@@ -0,0 +1,213 @@
+import socket
+import socketserver
+import struct
+import threading
+
+
+_TYPE_A = 1
+_TYPE_AAAA = 28
+_CLASS_IN = 1
+
+_RCODE_SERVFAIL = 2
+
+
+class DnsFormatError(Exception):
+    """Raised for DNS messages the sinkhole cannot parse"""
+
+
+def parse_question(message):
+    """Return (name, qtype, qclass, end offset) of a single-question query"""
+    if len(message) < 12:
+        raise DnsFormatError("Message shorter than a DNS header")
+    flags, qdcount = struct.unpack(">HH", message[2:6])
+    if flags & 0x8000 or qdcount != 1:
+        raise DnsFormatError("Not a single-question query")
+
+    labels = []
+    offset = 12
+    while True:
+        if offset >= len(message):
+            raise DnsFormatError("Truncated question name")
+        length = message[offset]
+        offset += 1
+        if length == 0:
+            break
+        if length & 0xC0:
+            raise DnsFormatError("Compressed question name")
+        labels.append(message[offset:offset + length])
+        offset += length
+
+    if offset + 4 > len(message):
+        raise DnsFormatError("Truncated question")
+    qtype, qclass = struct.unpack(">HH", message[offset:offset + 4])
+    name = b".".join(labels).decode("ascii", "replace").lower()
+    return name, qtype, qclass, offset + 4
+
+
+def build_response(query, end, rcode=0, answers=()):
+    """Build a response echoing the query's question.
+
+    ``answers`` are (qtype, ttl, rdata) tuples for the queried name.
+    """
+    flags = struct.unpack(">H", query[2:4])[0]
+    # QR + the query's opcode and RD bit + RA
+    flags = 0x8000 | (flags & 0x7900) | 0x0080 | rcode
+    header = query[:2] + struct.pack(">HHHHH", flags, 1, len(answers), 0, 0)
+    records = b"".join(
+        # 0xC00C points back at the name in the question
+        struct.pack(">HHHIH", 0xC00C, qtype, _CLASS_IN, ttl, len(rdata)) + rdata
+        for qtype, ttl, rdata in answers
+    )
+    return header + query[12:end] + records
+
+
+class SinkholeResolver:
+    """Small local DNS server that sinkholes blocked names.
+
+    Queries for names accepted by ``is_blocked`` (which receives the
+    lowercased query name) are answered locally: A queries with
+    ``sinkhole_ipv4``, AAAA queries with ``sinkhole_ipv6`` and any other
+    type with an empty answer. Everything else is forwarded unchanged to
+    ``upstream``. Because ``is_blocked`` is consulted on every query,
+    blocklist changes apply immediately. Serves UDP and TCP on
+    ``address``; point the system resolver at it to use it.
+    """
+
+    def __init__(
+        self,
+        is_blocked,
+        upstream=("1.1.1.1", 53),
+        address=("127.0.0.1", 53),
+        sinkhole_ipv4="127.0.0.1",
+        sinkhole_ipv6="::1",
+        ttl=10,
+        timeout=3.0,
+    ):
+        self.is_blocked = is_blocked
+        self.upstream = upstream
+        self.address = address
+        self.ttl = ttl
+        self.timeout = timeout
+        self._ipv4 = socket.inet_pton(socket.AF_INET, sinkhole_ipv4)
+        self._ipv6 = socket.inet_pton(socket.AF_INET6, sinkhole_ipv6)
+        self._upstream_family = (
+            socket.AF_INET6 if ":" in upstream[0] else socket.AF_INET
+        )
+        self._servers = []
+
+    @property
+    def server_address(self):
+        """Address the UDP server is bound to (useful with port 0)"""
+        return self._servers[0].server_address if self._servers else None
+
+    def start(self):
+        """Start serving on background threads"""
+        if self._servers:
+            return
+        resolver = self
+
+        class UDPHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                query, sock = self.request
+                response = resolver.resolve(query, tcp=False)
+                if response:
+                    sock.sendto(response, self.client_address)
+
+        class TCPHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.request.settimeout(resolver.timeout)
+                while True:
+                    query = _read_tcp_message(self.request)
+                    if query is None:
+                        return
+                    response = resolver.resolve(query, tcp=True)
+                    if not response:
+                        return
+                    self.request.sendall(struct.pack(">H", len(response)) + response)
+
+        family = socket.AF_INET6 if ":" in self.address[0] else socket.AF_INET
+
+        class UDPServer(socketserver.ThreadingUDPServer):
+            address_family = family
+            daemon_threads = True
+            allow_reuse_address = True
+
+        class TCPServer(socketserver.ThreadingTCPServer):
+            address_family = family
+            daemon_threads = True
+            allow_reuse_address = True
+
+        udp = UDPServer(self.address, UDPHandler)
+        # Serve TCP on the same port, which matters when port 0 was asked for
+        tcp = TCPServer((self.address[0], udp.server_address[1]), TCPHandler)
+        self._servers = [udp, tcp]
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Stop serving and close the sockets"""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def resolve(self, query, tcp=False):
+        """Answer one raw DNS query, returning the raw response or None"""
+        try:
+            name, qtype, qclass, end = parse_question(query)
+        except DnsFormatError:
+            return self._forward(query, tcp)
+
+        if qclass != _CLASS_IN or not self.is_blocked(name):
+            return self._forward(query, tcp)
+
+        answers = []
+        if qtype == _TYPE_A:
+            answers.append((_TYPE_A, self.ttl, self._ipv4))
+        elif qtype == _TYPE_AAAA:
+            answers.append((_TYPE_AAAA, self.ttl, self._ipv6))
+        return build_response(query, end, answers=answers)
+
+    def _forward(self, query, tcp):
+        """Relay a query to the upstream server"""
+        try:
+            if tcp:
+                with socket.create_connection(self.upstream, self.timeout) as sock:
+                    sock.sendall(struct.pack(">H", len(query)) + query)
+                    return _read_tcp_message(sock)
+            with socket.socket(self._upstream_family, socket.SOCK_DGRAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.sendto(query, self.upstream)
+                while True:
+                    response, _ = sock.recvfrom(65535)
+                    # Ignore stray datagrams that don't answer this query
+                    if response[:2] == query[:2]:
+                        return response
+        except OSError as e:
+            print(f"Error forwarding DNS query: {e}")
+            try:
+                _, _, _, end = parse_question(query)
+            except DnsFormatError:
+                return None
+            return build_response(query, end, rcode=_RCODE_SERVFAIL)
+
+
+def _read_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _read_tcp_message(sock):
+    """Read one length-prefixed DNS message from a TCP stream"""
+    try:
+        prefix = _read_exact(sock, 2)
+        if prefix is None:
+            return None
+        return _read_exact(sock, struct.unpack(">H", prefix)[0])
+    except OSError:
+        return None
@@ -0,0 +1,214 @@
+"""Keyword weights and vectorized scoring of many documents at once"""
+
+
+# Score added per hit of a keyword in each category
+CATEGORY_WEIGHTS = {"explicit": 0.3, "moderate": 0.15}
+
+# A document is blocked once any category score reaches its threshold
+BLOCK_THRESHOLDS = {"explicit": 0.3, "moderate": 0.45}
+
+
+def score_hits(keywords, counts, category_weights=None, keyword_weights=None):
+    """Turn keyword hit counts into a blocking decision and detailed scores.
+
+    ``keywords`` are the lists the counts were made with, and ``counts``
+    maps (category, keyword) to its number of hits.
+    """
+    category_weights = CATEGORY_WEIGHTS if category_weights is None else category_weights
+    keyword_weights = keyword_weights or {}
+    scores = {
+        "explicit": 0.0,
+        "moderate": 0.0,
+        "safe": 1.0,  # Start with assumption of safe
+        "matches": {"explicit": [], "moderate": []},
+    }
+
+    for category, weight in category_weights.items():
+        for keyword in keywords.get(category, []):
+            matches = counts.get((category, keyword), 0)
+            if matches > 0:
+                scores["matches"][category].append((keyword, matches))
+                # Explicit hits reduce the safety score more than moderate ones
+                scores[category] += keyword_weights.get((category, keyword), weight) * matches
+
+    # Normalize scores
+    total_score = scores["explicit"] + scores["moderate"]
+    if total_score > 1.0:
+        scores["explicit"] = min(1.0, scores["explicit"])
+        scores["moderate"] = min(1.0, scores["moderate"])
+        scores["safe"] = 0.0
+    else:
+        scores["safe"] = max(0.0, 1.0 - total_score)
+
+    # Determine if content should be blocked
+    should_block = any(
+        scores[category] >= threshold
+        for category, threshold in BLOCK_THRESHOLDS.items()
+    )
+    return should_block, scores
+
+
+class RunningScores:
+    """Category scores of a document that is still being scanned.
+
+    update() adds only the hits that are new since the last call, so a
+    streamed page can be checked against the block thresholds after every
+    chunk without rescoring every keyword as score_hits does.
+    """
+
+    def __init__(self, category_weights=None, keyword_weights=None):
+        self.category_weights = CATEGORY_WEIGHTS if category_weights is None else category_weights
+        self.keyword_weights = keyword_weights or {}
+        self.scores = dict.fromkeys(self.category_weights, 0.0)
+        # (category, keyword) -> hits already added to the scores
+        self._seen = {}
+
+    def update(self, counts):
+        """Add the hits in counts that were not there on the last update"""
+        seen = self._seen
+        scores = self.scores
+        for column, matches in counts.items():
+            new = matches - seen.get(column, 0)
+            if new:
+                seen[column] = matches
+                category = column[0]
+                if category in scores:
+                    weight = self.keyword_weights.get(column, self.category_weights[category])
+                    scores[category] += weight * new
+
+    def over_threshold(self):
+        """Whether any category score has reached its block threshold"""
+        scores = self.scores
+        return any(
+            scores.get(category, 0.0) >= threshold
+            for category, threshold in BLOCK_THRESHOLDS.items()
+        )
+
+
+class BatchScorer:
+    """Score a batch of documents with NumPy instead of one at a time.
+
+    Every scored (category, keyword) pair gets a column id. The matcher's
+    hit counts for each document go straight into a documents x keywords
+    matrix, and the explicit/moderate/safe scores and block
+    decisions for the whole batch come out of a few array operations.
+
+    The per-keyword weights are a vector, built from ``category_weights``
+    with per-keyword overrides from ``keyword_weights``. Category scores
+    are summed in keyword order, exactly as score_hits adds them up, so
+    both give the same verdict for the same text.
+    """
+
+    def __init__(self, matcher, category_weights=None, keyword_weights=None):
+        import numpy as np
+
+        self.matcher = matcher
+        self.category_weights = dict(category_weights or CATEGORY_WEIGHTS)
+        self.keyword_weights = dict(keyword_weights or {})
+
+        # Column id -> (category, keyword), grouped by category in the
+        # matcher's keyword order
+        self.columns = []
+        # Category -> slice of its columns
+        self.spans = {}
+        for category in self.category_weights:
+            start = len(self.columns)
+            words = dict.fromkeys(matcher.keywords.get(category, ()))
+            self.columns.extend((category, keyword) for keyword in words)
+            self.spans[category] = slice(start, len(self.columns))
+        self.index = {column: i for i, column in enumerate(self.columns)}
+
+        self.weights = np.fromiter(
+            (
+                self.keyword_weights.get(column, self.category_weights[column[0]])
+                for column in self.columns
+            ),
+            dtype=np.float64,
+            count=len(self.columns),
+        )
+
+    def keyword_counts(self, document):
+        """(column ids, hit counts) of the keywords in a lowercased document"""
+        index = self.index
+        ids = []
+        hits = []
+        for column, matches in self.matcher.count(document).items():
+            column_id = index.get(column)
+            if column_id is not None:
+                ids.append(column_id)
+                hits.append(matches)
+        return ids, hits
+
+    def count_matrix(self, keyword_counts):
+        """documents x keywords hit counts from per-document keyword_counts"""
+        import numpy as np
+
+        counts = np.zeros((len(keyword_counts), len(self.columns)), dtype=np.int32)
+        for row, (ids, hits) in enumerate(keyword_counts):
+            counts[row, ids] = hits
+        return counts
+
+    def score_counts(self, counts):
+        """Scores and block decisions for a documents x keywords matrix.
+
+        Returns (should_block, scores) where should_block is a boolean
+        array and scores maps "explicit", "moderate" and "safe" to float
+        arrays, one entry per document.
+        """
+        import numpy as np
+
+        documents = counts.shape[0]
+        scores = {}
+        for category, span in self.spans.items():
+            block = counts[:, span]
+            # Columns nobody hit add nothing, so leave them out of the sum
+            used = np.flatnonzero(block.any(axis=0))
+            if not len(used):
+                scores[category] = np.zeros(documents)
+                continue
+            weighted = block[:, used] * self.weights[span][used]
+            # cumsum adds left to right, like score_hits does
+            scores[category] = np.cumsum(weighted, axis=1)[:, -1]
+
+        explicit = scores.get("explicit", np.zeros(documents))
+        moderate = scores.get("moderate", np.zeros(documents))
+        total = explicit + moderate
+        over = total > 1.0
+        scores["explicit"] = np.where(over, np.minimum(explicit, 1.0), explicit)
+        scores["moderate"] = np.where(over, np.minimum(moderate, 1.0), moderate)
+        scores["safe"] = np.where(over, 0.0, np.maximum(0.0, 1.0 - total))
+
+        should_block = np.zeros(documents, dtype=bool)
+        for category, threshold in BLOCK_THRESHOLDS.items():
+            if category in scores:
+                should_block |= scores[category] >= threshold
+        return should_block, scores
+
+    def score(self, documents):
+        """(should_block, scores) per lowercased document, as check_content gives"""
+        import numpy as np
+
+        counts = self.count_matrix([self.keyword_counts(document) for document in documents])
+        should_block, scores = self.score_counts(counts)
+
+        results = []
+        for row in range(len(documents)):
+            matches = {}
+            for category, span in self.spans.items():
+                hits = counts[row, span]
+                matches[category] = [
+                    (self.columns[span.start + i][1], int(hits[i]))
+                    for i in np.flatnonzero(hits)
+                ]
+            results.append(
+                (
+                    bool(should_block[row]),
+                    {
+                        "explicit": float(scores["explicit"][row]),
+                        "moderate": float(scores["moderate"][row]),
+                        "safe": float(scores["safe"][row]),
+                        "matches": matches,
+                    },
+                )
+            )
+        return results
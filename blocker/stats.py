@@ -0,0 +1,146 @@
+import http.server
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Stats:
+    """Thread-safe counters and stage timers.
+
+    Counters only go up. A timer keeps the number of timed calls, their
+    total and the longest one, so the mean and worst case of every stage
+    can be read back with ``snapshot``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        # stage -> [count, total seconds, max seconds]
+        self._timers = {}
+
+    def increment(self, name, amount=1):
+        """Add to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def record(self, stage, seconds, count=1):
+        """Add ``count`` timed calls taking ``seconds`` in all to a stage"""
+        with self._lock:
+            timer = self._timers.get(stage)
+            if timer is None:
+                self._timers[stage] = [count, seconds, seconds]
+            else:
+                timer[0] += count
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the body of a with block as one call of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Copy of the counters and timer summaries"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timers": {
+                    stage: {
+                        "count": count,
+                        "total": total,
+                        "mean": total / count if count else 0.0,
+                        "max": longest,
+                    }
+                    for stage, (count, total, longest) in self._timers.items()
+                },
+            }
+
+    def reset(self):
+        """Zero every counter and timer"""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+def prometheus_text(snapshot, gauges=None, prefix="nsfw_blocker"):
+    """Render a Stats snapshot (and extra gauges) in Prometheus text format"""
+    lines = []
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines.append(f"{prefix}_{name}_total {value}")
+
+    timers = sorted(snapshot["timers"].items())
+    if timers:
+        lines.append(f"# TYPE {prefix}_stage_seconds summary")
+        for stage, timer in timers:
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {timer["total"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {timer["count"]}')
+        lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+        for stage, timer in timers:
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{stage}"}} {timer["max"]:.6f}')
+
+    for name, value in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_file(path, text):
+    """Write metrics for a node_exporter textfile collector, atomically"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class MetricsServer:
+    """Serves ``render()`` as Prometheus text at /metrics on a local port"""
+
+    def __init__(self, render, address=("127.0.0.1", 9464)):
+        self.render = render
+        self.address = address
+        self._server = None
+
+    @property
+    def server_address(self):
+        """Address the server is bound to (useful with port 0)"""
+        return self._server.server_address if self._server else None
+
+    def start(self):
+        """Start serving on a background thread"""
+        if self._server is not None:
+            return
+        render = self.render
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+
+        self._server = Server(self.address, Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,137 @@
+import hashlib
+import mmap
+import os
+import struct
+
+
+MAGIC = b"NSFWBL1\0"
+
+# magic, name count, Bloom filter size in bits, Bloom hash count, padding
+_HEADER = struct.Struct("<8sQQII")
+_OFFSET = struct.Struct("<Q")
+
+BLOOM_BITS_PER_NAME = 10
+BLOOM_HASHES = 7
+
+
+def _bloom_hashes(key):
+    """Two 32-bit hashes of a key for double hashing"""
+    digest = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+    return digest & 0xFFFFFFFF, (digest >> 32) | 1
+
+
+class CompactStore:
+    """Read-only, memory-mapped set of host names.
+
+    File layout: a header, an offset table of count + 1 entries, a Bloom
+    filter, then the sorted, deduplicated UTF-8 names back to back. Opening
+    only maps the file, and a lookup first checks the Bloom filter, so most
+    names that are not in the set never touch the offset table; the rest
+    are found by binary search.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._count = 0
+        if os.path.exists(path):
+            self._open()
+
+    def _open(self):
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, bloom_bits, hashes, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a blocklist store")
+        self._count = count
+        self._bloom_bits = bloom_bits
+        self._hashes = hashes
+        self._offsets = _HEADER.size
+        self._bloom = self._offsets + _OFFSET.size * (count + 1)
+        self._data = self._bloom + bloom_bits // 8
+
+    def close(self):
+        """Unmap the file"""
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = None
+        self._file = None
+        self._count = 0
+
+    @staticmethod
+    def build(path, names):
+        """Write a store for names to path, replacing it atomically"""
+        import numpy as np
+
+        keys = sorted({name.encode("utf-8") for name in names})
+        names = None
+        count = len(keys)
+        bloom_bits = max(64, -(-count * BLOOM_BITS_PER_NAME // 8) * 8)
+
+        blake2b = hashlib.blake2b
+        digests = np.frombuffer(
+            b"".join(blake2b(key, digest_size=8).digest() for key in keys),
+            dtype="<u8",
+        )
+        first = digests & np.uint64(0xFFFFFFFF)
+        second = (digests >> np.uint64(32)) | np.uint64(1)
+        bits = np.zeros(bloom_bits, dtype=bool)
+        for i in range(BLOOM_HASHES):
+            bits[(first + np.uint64(i) * second) % np.uint64(bloom_bits)] = True
+
+        offsets = np.zeros(count + 1, dtype="<u8")
+        np.cumsum([len(key) for key in keys], out=offsets[1:])
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, count, bloom_bits, BLOOM_HASHES, 0))
+            f.write(offsets.tobytes())
+            f.write(np.packbits(bits, bitorder="little").tobytes())
+            f.writelines(keys)
+        os.replace(temp_path, path)
+
+    def _offset(self, index):
+        return _OFFSET.unpack_from(self._map, self._offsets + _OFFSET.size * index)[0]
+
+    def _key(self, index):
+        start = self._data + self._offset(index)
+        end = self._data + self._offset(index + 1)
+        return self._map[start:end]
+
+    def might_contain(self, key):
+        """Bloom filter check: False means the key is definitely absent"""
+        first, second = _bloom_hashes(key)
+        bloom, size, data = self._bloom, self._bloom_bits, self._map
+        for i in range(self._hashes):
+            bit = (first + i * second) % size
+            if not data[bloom + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def __contains__(self, name):
+        if not self._count:
+            return False
+        key = name.encode("utf-8")
+        if not self.might_contain(key):
+            return False
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            probe = self._key(middle)
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self._key(index).decode("utf-8")
+
+    def __len__(self):
+        return self._count
@@ -1,6 +1,7 @@
 import os
 import json
-from urllib.parse import urlparse
+import tempfile
+from urllib.parse import urlparse, urlunparse
 
 def is_valid_url(url):
     """Check if a given string is a valid URL"""
@@ -10,6 +11,15 @@ def is_valid_url(url):
     except:
         return False
 
+def normalize_url(url):
+    """Normalize a URL so that equivalent spellings map to the same key"""
+    result = urlparse(url.strip())
+    scheme = result.scheme.lower()
+    netloc = (result.hostname or "").rstrip(".")
+    if result.port and (scheme, result.port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{result.port}"
+    return urlunparse((scheme, netloc, result.path or "/", "", result.query, ""))
+
 def ensure_directory(path):
     """Ensure a directory exists, create it if it doesn't"""
     if not os.path.exists(path):
@@ -23,7 +33,28 @@ def load_json_file(filepath, default=None):
     except (FileNotFoundError, json.JSONDecodeError):
         return default if default is not None else {}
 
-def save_json_file(filepath, data):
-    """Save data to a JSON file"""
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+def save_json_file(filepath, data, compact=False):
+    """Save data to a JSON file, replacing it atomically.
+
+    The data is written to a uniquely named temporary file next to the
+    target and renamed over it, so readers never see a partially written
+    file and concurrent writers never share one. compact=True drops the
+    indentation and spaces, for large, machine-read files.
+    """
+    directory, name = os.path.split(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(prefix=name + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            if compact:
+                json.dump(data, f, separators=(',', ':'))
+            else:
+                json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
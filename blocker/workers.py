@@ -0,0 +1,156 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .extract import extract_text, incremental_decoder
+from .scoring import BatchScorer, score_hits
+
+
+# Per-process scoring state, set once by _init_worker
+_state = {}
+
+
+def _init_worker(matcher, category_weights, keyword_weights, html_backend):
+    """Receive the keyword matcher and settings when a worker starts"""
+    _state.update(
+        matcher=matcher,
+        category_weights=category_weights,
+        keyword_weights=keyword_weights,
+        html_backend=html_backend,
+        batch_scorer=None,
+    )
+
+
+def _compact(verdict):
+    """(should_block, scores) as a flat tuple, cheaper to send back"""
+    should_block, scores = verdict
+    return (
+        should_block,
+        scores["explicit"],
+        scores["moderate"],
+        scores["safe"],
+        scores["matches"]["explicit"],
+        scores["matches"]["moderate"],
+    )
+
+
+def expand(result):
+    """Turn a worker's compact result back into (should_block, scores)"""
+    should_block, explicit, moderate, safe, explicit_matches, moderate_matches = result
+    return should_block, {
+        "explicit": explicit,
+        "moderate": moderate,
+        "safe": safe,
+        "matches": {"explicit": explicit_matches, "moderate": moderate_matches},
+    }
+
+
+def _score(text):
+    matcher = _state["matcher"]
+    return score_hits(
+        matcher.keywords,
+        matcher.count(text.lower()),
+        _state["category_weights"],
+        _state["keyword_weights"],
+    )
+
+
+def _score_text(text):
+    """Worker task: score extracted text; returns (result, match seconds)"""
+    start = time.perf_counter()
+    result = _compact(_score(text))
+    return result, time.perf_counter() - start
+
+
+def _score_body(body, encoding):
+    """Worker task: decode, extract and score a raw HTML body.
+
+    Returns the compact result and the decode, extract and match seconds.
+    """
+    clock = time.perf_counter
+    start = clock()
+    html = incremental_decoder(encoding).decode(body, final=True)
+    decoded = clock()
+    text = extract_text(html, _state["html_backend"])
+    extracted = clock()
+    result = _compact(_score(text))
+    return result, (decoded - start, extracted - decoded, clock() - extracted)
+
+
+def _score_batch(texts):
+    """Worker task: score texts together with the worker's BatchScorer"""
+    start = time.perf_counter()
+    scorer = _state["batch_scorer"]
+    if scorer is None:
+        scorer = _state["batch_scorer"] = BatchScorer(
+            _state["matcher"], _state["category_weights"], _state["keyword_weights"]
+        )
+    results = [_compact(verdict) for verdict in scorer.score([text.lower() for text in texts])]
+    return results, time.perf_counter() - start
+
+
+class ScoringPool:
+    """Worker processes that score pages on every core.
+
+    Extraction and keyword matching are pure Python, so threads share one
+    core between them. Each worker gets the keyword matcher, weights and
+    HTML backend once when it starts, then takes raw bodies or extracted
+    text and sends back compact tuples; see ``expand``. A pool is tied to
+    the matcher it was started with, so ContentFilter starts a new one
+    when the keywords change.
+
+    Workers are spawned rather than forked: the pool is started from fetch
+    threads, and a child forked from a multithreaded process can hang on
+    a lock another thread held at the time.
+    """
+
+    def __init__(
+        self,
+        matcher,
+        processes=None,
+        category_weights=None,
+        keyword_weights=None,
+        html_backend=None,
+    ):
+        self.matcher = matcher
+        self.processes = processes
+        self.category_weights = dict(category_weights or {})
+        self.keyword_weights = dict(keyword_weights or {})
+        self.html_backend = html_backend
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                matcher,
+                self.category_weights,
+                self.keyword_weights,
+                html_backend,
+            ),
+        )
+
+    def is_current(self, matcher, processes, category_weights, keyword_weights, html_backend):
+        """Whether the workers score with these settings"""
+        return (
+            self.matcher is matcher
+            and self.processes == processes
+            and self.category_weights == category_weights
+            and self.keyword_weights == keyword_weights
+            and self.html_backend == html_backend
+        )
+
+    def submit_text(self, text):
+        """Future of (compact result, match seconds) for extracted text"""
+        return self._executor.submit(_score_text, text)
+
+    def submit_body(self, body, encoding=None):
+        """Future of (compact result, (decode, extract, match seconds)) for HTML bytes"""
+        return self._executor.submit(_score_body, body, encoding)
+
+    def submit_batch(self, texts):
+        """Future of ([compact result, ...], seconds) for a batch of texts"""
+        return self._executor.submit(_score_batch, list(texts))
+
+    def close(self, wait=True):
+        """Stop the workers"""
+        self._executor.shutdown(wait=wait)
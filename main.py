@@ -1,13 +1,42 @@
+import time
+
+# Taken before the Qt and blocker imports so startup timings include them
+STARTED = time.perf_counter()
+
+import argparse
+import multiprocessing
 import sys
-from PyQt5.QtWidgets import QApplication
-from blocker.gui import BlockerWindow
+from contextlib import nullcontext
+
+from blocker.profiling import PROFILE_ENV, profiler_from_env
 
 
 def main():
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)  # Allow running in system tray
-    window = BlockerWindow()
-    window.show()
+    # Scoring workers are spawned; a frozen build must run them, not the GUI
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="NSFW Blocker")
+    parser.add_argument(
+        "--no-welcome", action="store_true", help="skip the welcome dialog"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=f"profile startup and filter operations into DIR (or set ${PROFILE_ENV})",
+    )
+    args, qt_args = parser.parse_known_args()
+
+    profiler = profiler_from_env(args.profile)
+    startup = profiler.profile("startup") if profiler else nullcontext()
+    with startup:
+        from PyQt5.QtWidgets import QApplication
+        from blocker.gui import BlockerWindow
+
+        app = QApplication(sys.argv[:1] + qt_args)
+        app.setQuitOnLastWindowClosed(False)  # Allow running in system tray
+        window = BlockerWindow(
+            show_welcome=not args.no_welcome, started=STARTED, profiler=profiler
+        )
+        window.show()
     sys.exit(app.exec_())
 
 
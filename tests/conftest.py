@@ -0,0 +1,58 @@
+import http.server
+import threading
+
+import pytest
+
+from blocker.dns import BackgroundFlusher, NullFlusher
+from blocker.filter import ContentFilter
+
+
+@pytest.fixture
+def hosts_file(tmp_path):
+    path = tmp_path / "hosts"
+    path.write_text("127.0.0.1 localhost\n")
+    return path
+
+
+@pytest.fixture
+def make_filter(tmp_path, hosts_file, monkeypatch):
+    """Build ContentFilters whose state files live in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    filters = []
+
+    def make(**kwargs):
+        kwargs.setdefault("hosts_path", str(hosts_file))
+        content_filter = ContentFilter(**kwargs)
+        content_filter.dns_flusher = BackgroundFlusher(NullFlusher())
+        content_filter.keywords.save_delay = 0
+        filters.append(content_filter)
+        return content_filter
+
+    yield make
+    for content_filter in filters:
+        content_filter.close()
+
+
+@pytest.fixture
+def content_filter(make_filter):
+    return make_filter()
+
+
+@pytest.fixture
+def http_server():
+    """Start a local HTTP server for a handler class; yields its base URL"""
+    servers = []
+
+    def start(handler):
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+
+        server = Server(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,74 @@
+import threading
+
+from blocker.blocklist import Blocklist
+
+
+def test_journal_survives_reload(tmp_path):
+    path = str(tmp_path / "blocked.bin")
+    blocklist = Blocklist(path)
+    blocklist.add(["a.com", "b.com"])
+    blocklist.save()
+    blocklist.discard(["a.com"])
+    assert blocklist.save() == ([], True)
+    blocklist.close()
+
+    reloaded = Blocklist(path)
+    assert "a.com" not in reloaded
+    assert reloaded.find("x.b.com") == "b.com"
+    assert len(reloaded) == 1
+    reloaded.close()
+
+
+def test_compact_folds_the_overlay_into_the_store(tmp_path):
+    path = str(tmp_path / "blocked.bin")
+    blocklist = Blocklist(path, compact_threshold=10)
+    blocklist.add(f"site{i}.com" for i in range(100))
+    blocklist.save()
+    blocklist.discard(["site1.com"])
+    blocklist.add(["extra.com"])
+    blocklist.save()
+    blocklist.compact()
+
+    assert not (tmp_path / "blocked.bin.journal").exists()
+    assert "site1.com" not in blocklist
+    assert "extra.com" in blocklist
+    assert len(blocklist) == 100
+    blocklist.close()
+
+
+def test_lookups_stay_correct_during_compaction(tmp_path):
+    blocklist = Blocklist(str(tmp_path / "blocked.bin"))
+    blocklist.add(f"site{i}.com" for i in range(50000))
+    blocklist.save()
+    blocklist.add(["new.com"])
+    blocklist.discard(["site7.com"])
+    blocklist.save()
+
+    wrong = []
+    errors = []
+    done = threading.Event()
+
+    def probe():
+        while not done.is_set():
+            try:
+                if (
+                    blocklist.find("a.site5.com") != "site5.com"
+                    or "new.com" not in blocklist
+                    or "site7.com" in blocklist
+                ):
+                    wrong.append(True)
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    try:
+        for _ in range(3):
+            blocklist.compact()
+    finally:
+        done.set()
+        thread.join()
+    blocklist.close()
+
+    assert errors == []
+    assert wrong == []
@@ -0,0 +1,121 @@
+import http.server
+
+import pytest
+
+
+PAGE = b"<html><body><p>Some badword here</p></body></html>"
+
+
+@pytest.fixture
+def etag_server(http_server):
+    """A page served with an ETag; records the validators it was sent"""
+    seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            seen.append(self.headers.get("If-None-Match"))
+            if self.path == "/missing":
+                self.send_error(404)
+                return
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    return http_server(Handler), seen
+
+
+@pytest.mark.parametrize("stream", [True, False])
+def test_unchanged_page_reuses_previous_verdict(content_filter, etag_server, stream):
+    base, seen = etag_server
+    content_filter.add_keyword("badword")
+
+    first = content_filter.check_webpage(base + "/page", stream=stream)
+    assert first[0] is True
+    assert first[1]["matches"]["explicit"] == [("badword", 1)]
+
+    # Drop the verdict cache so the page is requested again
+    content_filter.verdict_cache.clear()
+    second = content_filter.check_webpage(base + "/page", stream=stream)
+
+    assert seen == [None, '"v1"']
+    assert second == first
+    assert content_filter.stats()["counters"]["not_modified"] == 1
+
+
+def test_keyword_change_drops_stored_validators(content_filter, etag_server):
+    base, seen = etag_server
+    content_filter.add_keyword("badword")
+    content_filter.check_webpage(base + "/page")
+
+    content_filter.remove_keyword("badword")
+    should_block, _ = content_filter.check_webpage(base + "/page")
+
+    # The old verdict no longer applies, so the page is fetched in full
+    assert seen == [None, None]
+    assert should_block is False
+
+
+def test_verdict_cache_answers_repeat_checks(content_filter, etag_server):
+    base, seen = etag_server
+    content_filter.check_webpage(base + "/page")
+    content_filter.check_webpage(base + "/page")
+
+    assert len(seen) == 1
+    assert content_filter.stats()["counters"]["verdict_cache_hits"] == 1
+
+
+def test_http_error_fails_the_check_and_is_not_cached(content_filter, etag_server):
+    base, _ = etag_server
+
+    results = list(content_filter.check_webpages([base + "/missing"]))
+
+    assert len(results) == 1
+    url, should_block, scores = results[0]
+    assert should_block is None
+    assert "404" in scores["error"]
+    assert len(content_filter.verdict_cache) == 0
+
+
+def test_malformed_url_fails_on_its_own(content_filter, etag_server):
+    base, _ = etag_server
+
+    results = {
+        url: (should_block, scores)
+        for url, should_block, scores in content_filter.check_webpages(
+            ["http://[bad", base + "/page"]
+        )
+    }
+
+    assert results["http://[bad"][0] is None
+    assert results["http://[bad"][1]["error"]
+    assert results[base + "/page"][0] is False
+
+
+def test_scoring_pool_scores_identical_bodies_once(content_filter, etag_server):
+    base, _ = etag_server
+    content_filter.add_keyword("badword")
+    urls = [base + "/page?1", base + "/page?2"]
+
+    results = [
+        should_block
+        for _, should_block, _ in content_filter.check_webpages(
+            urls, max_workers=1, processes=1
+        )
+    ]
+
+    assert results == [True, True]
+    assert content_filter.score_cache.stats()["hits"] == 1
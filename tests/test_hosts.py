@@ -0,0 +1,112 @@
+import pytest
+
+from blocker.hosts import BEGIN_MARKER, END_MARKER, HostsSection
+
+
+ORIGINAL = b"127.0.0.1 localhost\n::1 localhost\n"
+
+
+def section(*names, newline="\n"):
+    lines = [BEGIN_MARKER] + [f"127.0.0.1 {name}" for name in names] + [END_MARKER]
+    return "".join(line + newline for line in lines).encode("utf-8")
+
+
+@pytest.fixture
+def hosts(tmp_path):
+    path = tmp_path / "hosts"
+    path.write_bytes(ORIGINAL)
+    return path
+
+
+def test_write_adds_then_replaces_the_section(hosts):
+    section_file = HostsSection(str(hosts))
+    assert not section_file.is_installed()
+
+    section_file.write(["a.com", "b.com"])
+    assert hosts.read_bytes() == ORIGINAL + section("a.com", "b.com")
+    assert section_file.is_installed()
+
+    section_file.write(["c.com"])
+    assert hosts.read_bytes() == ORIGINAL + section("c.com")
+
+
+def test_write_keeps_lines_after_the_section(hosts):
+    hosts.write_bytes(ORIGINAL + section("a.com") + b"10.0.0.1 intranet\n")
+
+    HostsSection(str(hosts)).write(["b.com"])
+
+    assert hosts.read_bytes() == ORIGINAL + section("b.com") + b"10.0.0.1 intranet\n"
+
+
+def test_write_starts_on_a_new_line(hosts):
+    hosts.write_bytes(b"127.0.0.1 localhost")
+
+    HostsSection(str(hosts)).write(["a.com"])
+
+    assert hosts.read_bytes() == b"127.0.0.1 localhost\n" + section("a.com")
+
+
+def test_append_adds_entries_inside_the_section(hosts):
+    section_file = HostsSection(str(hosts))
+    section_file.write(["a.com"])
+    hosts.write_bytes(hosts.read_bytes() + b"10.0.0.1 intranet\n")
+
+    section_file.append(["b.com"])
+    section_file.append(["c.com"])
+
+    assert hosts.read_bytes() == (
+        ORIGINAL + section("a.com", "b.com", "c.com") + b"10.0.0.1 intranet\n"
+    )
+
+
+def test_append_without_a_section_writes_one(hosts):
+    HostsSection(str(hosts)).append(["a.com"])
+
+    assert hosts.read_bytes() == ORIGINAL + section("a.com")
+
+
+def test_append_after_crlf_end_marker(hosts):
+    hosts.write_bytes(ORIGINAL + section("a.com", newline="\r\n") + b"::1 x\r\n")
+
+    HostsSection(str(hosts)).append(["b.com"])
+
+    assert hosts.read_bytes() == (
+        ORIGINAL
+        + f"{BEGIN_MARKER}\r\n127.0.0.1 a.com\r\n".encode()
+        + f"127.0.0.1 b.com\n{END_MARKER}\n".encode()
+        + b"::1 x\r\n"
+    )
+
+
+def test_append_after_end_marker_without_newline(hosts):
+    hosts.write_bytes(ORIGINAL + section("a.com")[:-1])
+
+    HostsSection(str(hosts)).append(["b.com"])
+
+    assert hosts.read_bytes() == ORIGINAL + section("a.com", "b.com")
+
+
+def test_changes_behind_our_back_are_noticed(hosts):
+    section_file = HostsSection(str(hosts))
+    section_file.write(["a.com"])
+    # Another program adds a line before the section
+    hosts.write_bytes(b"10.0.0.1 intranet\n" + hosts.read_bytes())
+
+    section_file.append(["b.com"])
+
+    assert hosts.read_bytes() == (
+        b"10.0.0.1 intranet\n" + ORIGINAL + section("a.com", "b.com")
+    )
+
+
+def test_remove_restores_the_original_file(hosts):
+    hosts.write_bytes(ORIGINAL + section("a.com") + b"10.0.0.1 intranet\n")
+    section_file = HostsSection(str(hosts))
+
+    section_file.remove()
+
+    assert hosts.read_bytes() == ORIGINAL + b"10.0.0.1 intranet\n"
+    assert not section_file.is_installed()
+    # Removing again is harmless
+    section_file.remove()
+    assert hosts.read_bytes() == ORIGINAL + b"10.0.0.1 intranet\n"
@@ -0,0 +1,146 @@
+import socket
+import socketserver
+import struct
+import threading
+
+import pytest
+
+from blocker.resolver import SinkholeResolver, build_response, parse_question
+
+
+UPSTREAM_ADDRESS = bytes([10, 0, 0, 1])
+
+
+def make_query(name, qtype=1, query_id=0x1234):
+    """A recursive single-question query for name"""
+    header = struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    labels = b"".join(
+        bytes([len(label)]) + label.encode("ascii") for label in name.split(".")
+    )
+    return header + labels + b"\0" + struct.pack(">HH", qtype, 1)
+
+
+def parse_response(response):
+    """(rcode, [(qtype, rdata), ...]) of a response to make_query"""
+    flags, _, ancount = struct.unpack(">HHH", response[2:8])
+    # parse_question only reads queries, so clear the response flags first
+    _, _, _, offset = parse_question(response[:2] + b"\0\0" + response[4:])
+    answers = []
+    for _ in range(ancount):
+        # Answers from build_response use a 2-byte name pointer
+        qtype, _, _, length = struct.unpack(">HHIH", response[offset + 2:offset + 12])
+        offset += 12
+        answers.append((qtype, response[offset:offset + length]))
+        offset += length
+    return flags & 0x000F, answers
+
+
+@pytest.fixture
+def upstream():
+    """Stub upstream answering every A query with 10.0.0.1; yields (address, queries)"""
+    queries = []
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            query, sock = self.request
+            name, qtype, _, end = parse_question(query)
+            queries.append(name)
+            answers = [(1, 60, UPSTREAM_ADDRESS)] if qtype == 1 else []
+            sock.sendto(build_response(query, end, answers=answers), self.client_address)
+
+    server = socketserver.ThreadingUDPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address, queries
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resolver(upstream):
+    blocked = {"blocked.test"}
+    resolver = SinkholeResolver(
+        lambda name: name in blocked or name.endswith(".blocked.test"),
+        upstream=upstream[0],
+        address=("127.0.0.1", 0),
+        timeout=1.0,
+    )
+    resolver.start()
+    yield resolver
+    resolver.stop()
+
+
+def ask_udp(address, query):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(2)
+        sock.sendto(query, address)
+        return sock.recvfrom(65535)[0]
+
+
+def ask_tcp(address, query):
+    with socket.create_connection(address, 2) as sock:
+        sock.sendall(struct.pack(">H", len(query)) + query)
+        length = struct.unpack(">H", sock.recv(2))[0]
+        data = b""
+        while len(data) < length:
+            data += sock.recv(length - len(data))
+        return data
+
+
+@pytest.mark.parametrize("ask", [ask_udp, ask_tcp])
+def test_blocked_names_are_sinkholed(resolver, upstream, ask):
+    address = resolver.server_address
+
+    response = ask(address, make_query("blocked.test"))
+    assert response[:2] == b"\x12\x34"
+    assert parse_response(response) == (0, [(1, socket.inet_aton("127.0.0.1"))])
+
+    response = ask(address, make_query("www.Blocked.test", qtype=28))
+    assert parse_response(response) == (0, [(28, socket.inet_pton(socket.AF_INET6, "::1"))])
+
+    # Other record types get an empty answer rather than the real one
+    response = ask(address, make_query("blocked.test", qtype=15))
+    assert parse_response(response) == (0, [])
+
+    assert upstream[1] == []
+
+
+def test_other_names_are_forwarded(resolver, upstream):
+    response = ask_udp(resolver.server_address, make_query("allowed.test", query_id=7))
+
+    assert response[:2] == b"\x00\x07"
+    assert parse_response(response) == (0, [(1, UPSTREAM_ADDRESS)])
+    assert upstream[1] == ["allowed.test"]
+
+
+def test_unreachable_upstream_gives_servfail():
+    # Nothing listens on this port, and the short timeout keeps the test fast
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        dead = sock.getsockname()
+    resolver = SinkholeResolver(lambda name: False, upstream=dead, timeout=0.2)
+
+    rcode, answers = parse_response(resolver.resolve(make_query("allowed.test")))
+
+    assert (rcode, answers) == (2, [])
+
+
+def test_dns_mode_follows_the_blocklist(make_filter, upstream, hosts_file):
+    content_filter = make_filter(mode="dns")
+    content_filter.dns_address = ("127.0.0.1", 0)
+    content_filter.dns_upstream = upstream[0]
+    assert content_filter.enable_blocking()
+    address = content_filter.resolver.server_address
+
+    assert parse_response(ask_udp(address, make_query("a.example.com")))[1] == [
+        (1, UPSTREAM_ADDRESS)
+    ]
+    content_filter.block_url("https://example.com/page")
+    assert parse_response(ask_udp(address, make_query("a.example.com")))[1] == [
+        (1, socket.inet_aton("127.0.0.1"))
+    ]
+
+    # DNS mode never touches the hosts file
+    assert hosts_file.read_text() == "127.0.0.1 localhost\n"
+    assert content_filter.disable_blocking()
+    assert content_filter.resolver is None or content_filter.resolver.server_address is None
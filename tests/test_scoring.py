@@ -0,0 +1,26 @@
+import pytest
+
+from blocker.matcher import KeywordMatcher
+from blocker.scoring import RunningScores, score_hits
+
+
+def test_running_scores_follow_score_hits_chunk_by_chunk():
+    keywords = {"explicit": ["bad", "worse"], "moderate": ["meh", "so so"]}
+    keyword_weights = {("moderate", "meh"): 0.05}
+    matcher = KeywordMatcher(keywords)
+    scanner = matcher.scanner()
+    running = RunningScores(keyword_weights=keyword_weights)
+
+    for chunk in ["meh so ", "so then meh ", "and meh, ", "then bad"]:
+        scanner.feed(chunk)
+        running.update(scanner.counts)
+        should_block, scores = score_hits(
+            keywords, scanner.counts, keyword_weights=keyword_weights
+        )
+        assert running.over_threshold() == should_block
+        assert running.scores["moderate"] == pytest.approx(scores["moderate"])
+    scanner.close()
+    running.update(scanner.counts)
+
+    assert running.over_threshold()
+    assert running.scores == pytest.approx({"explicit": 0.3, "moderate": 0.3})
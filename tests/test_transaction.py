@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from blocker.hosts import BEGIN_MARKER
+
+
+class Boom(Exception):
+    pass
+
+
+def section_names(hosts_file):
+    text = hosts_file.read_text()
+    if BEGIN_MARKER not in text:
+        return []
+    lines = text.split(BEGIN_MARKER, 1)[1].splitlines()[1:-1]
+    return [line.split()[1] for line in lines]
+
+
+@pytest.fixture
+def active_filter(content_filter):
+    assert content_filter.enable_blocking()
+    return content_filter
+
+
+def test_transaction_writes_once_on_exit(active_filter, hosts_file):
+    with active_filter.transaction():
+        active_filter.block_url("a.com")
+        active_filter.block_url("b.com")
+        # Nothing is written until the outermost transaction exits
+        assert section_names(hosts_file) == []
+
+    assert section_names(hosts_file) == ["a.com", "www.a.com", "b.com", "www.b.com"]
+
+
+def test_nested_transactions_write_at_the_outermost_exit(active_filter, hosts_file):
+    with active_filter.transaction():
+        with active_filter.transaction():
+            active_filter.block_url("a.com")
+        assert section_names(hosts_file) == []
+
+    assert section_names(hosts_file) == ["a.com", "www.a.com"]
+
+
+def test_rollback_restores_blocklist_and_hosts_file(active_filter, hosts_file, make_filter):
+    active_filter.block_url("keep.com")
+
+    with pytest.raises(Boom):
+        with active_filter.transaction():
+            active_filter.block_url("inside.com")
+            active_filter.unblock_url("keep.com")
+            raise Boom
+
+    assert active_filter.is_blocked("keep.com")
+    assert not active_filter.is_blocked("inside.com")
+    assert section_names(hosts_file) == ["keep.com", "www.keep.com"]
+
+    # Nothing from the rolled back transaction reached the disk either
+    active_filter.close()
+    reloaded = make_filter()
+    assert reloaded.is_blocked("keep.com")
+    assert not reloaded.is_blocked("inside.com")
+
+
+def test_debounced_write_does_not_fire_inside_a_transaction(active_filter, hosts_file, make_filter):
+    active_filter.commit_delay = 0.1
+    active_filter.block_url("first.com")
+
+    with pytest.raises(Boom):
+        with active_filter.transaction():
+            active_filter.block_url("inside.com")
+            # Long enough for the debounce timer of first.com to have fired
+            time.sleep(0.3)
+            assert section_names(hosts_file) == []
+            raise Boom
+
+    # The change from before the transaction is still written
+    time.sleep(0.3)
+    assert section_names(hosts_file) == ["first.com", "www.first.com"]
+
+    active_filter.close()
+    reloaded = make_filter()
+    assert reloaded.is_blocked("first.com")
+    assert not reloaded.is_blocked("inside.com")
+
+
+def test_block_urls_rolls_back_on_error(active_filter, hosts_file):
+    def urls():
+        yield "a.com"
+        raise Boom
+
+    assert active_filter.block_urls(urls()) == 0
+    assert not active_filter.is_blocked("a.com")
+    assert section_names(hosts_file) == []
+
+
+def test_other_threads_do_not_join_a_transaction(active_filter, hosts_file):
+    started = threading.Event()
+    blocked = []
+
+    def block_from_another_thread():
+        started.set()
+        blocked.append(active_filter.block_url("other.com"))
+
+    thread = threading.Thread(target=block_from_another_thread)
+    with pytest.raises(Boom):
+        with active_filter.transaction():
+            active_filter.block_url("inside.com")
+            thread.start()
+            started.wait()
+            time.sleep(0.1)
+            # The other thread waits for the transaction to finish
+            assert blocked == []
+            raise Boom
+    thread.join()
+
+    assert blocked == [True]
+    assert active_filter.is_blocked("other.com")
+    assert not active_filter.is_blocked("inside.com")
+    assert section_names(hosts_file) == ["other.com", "www.other.com"]